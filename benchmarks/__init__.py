@@ -0,0 +1,14 @@
+"""
+Benchmarks for drf-nested-routers.
+
+They run on the models of the test suite, in an in-memory SQLite
+database. The test suite only checks that `--quick` runs, which includes
+importing the package in one fresh interpreter; the timings are not
+compared to any threshold. Run them all, with JSON output:
+
+    ./runtests.py --bench [--quick] [--output results.json]
+
+or each module on its own, e.g.:
+
+    python -m benchmarks.routers
+"""
@@ -0,0 +1,67 @@
+"""
+Runs all the benchmarks and prints the results, in seconds, as JSON:
+
+    python -m benchmarks [--quick] [--output results.json]
+    ./runtests.py --bench [--quick] [--output results.json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+from typing import Any, Sequence
+
+from benchmarks.settings import configure
+
+configure()
+
+import django  # noqa: E402
+import rest_framework  # noqa: E402
+
+import rest_framework_nested  # noqa: E402
+from benchmarks import imports, routers, serializers, urls, viewsets  # noqa: E402
+
+# (levels, viewsets) of the router chains
+ROUTER_SIZES = ((1, 100), (4, 100), (4, 400))
+
+
+def run_all(quick: bool = False) -> dict[str, Any]:
+    router_sizes = ((2, 10),) if quick else ROUTER_SIZES
+    repeat = 1 if quick else 5
+    return {
+        'environment': {
+            'python': platform.python_version(),
+            'django': django.__version__,
+            'djangorestframework': rest_framework.__version__,
+            'drf-nested-routers': rest_framework_nested.__version__,
+        },
+        'benchmarks': {
+            'routers': [
+                {'levels': levels, 'viewsets': count, **routers.run(levels, count, repeat)}
+                for levels, count in router_sizes
+            ],
+            'urls': urls.run(number=100 if quick else 10000, repeat=repeat),
+            'serializers': serializers.run(sizes=(10,) if quick else serializers.SIZES, repeat=repeat),
+            'viewsets': viewsets.run(rows=10 if quick else 100, number=1 if quick else 50, repeat=repeat),
+            'imports': imports.run(modules=imports.MODULES[:1] if quick else imports.MODULES, repeat=repeat),
+        },
+    }
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--quick', action='store_true', help='small sizes, to check the benchmarks run')
+    parser.add_argument('--output', help='write the JSON results to this file instead of stdout')
+    args = parser.parse_args(argv)
+
+    results = json.dumps(run_all(args.quick), indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(results + '\n')
+    else:
+        print(results)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,29 @@
+"""
+Rows of the test models, for the benchmarks that hit the database.
+"""
+from __future__ import annotations
+
+from benchmarks.settings import configure
+
+configure()
+
+from tests.serializers.models import Child2, GrandChild1, Parent  # noqa: E402
+
+
+def create_grandchildren(rows: int) -> Child2:
+    """
+    Creates a `Parent` and a `Child2` holding `rows` `GrandChild1` rows,
+    and returns the `Child2`.
+    """
+    parent = Parent.objects.create(name='parent')
+    child = Child2.objects.create(root=parent, name='child')
+    GrandChild1.objects.bulk_create(
+        GrandChild1(parent=child, name=f'g{i}') for i in range(rows)
+    )
+    return child
+
+
+def clear() -> None:
+    GrandChild1.objects.all().delete()
+    Child2.objects.all().delete()
+    Parent.objects.all().delete()
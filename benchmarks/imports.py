@@ -0,0 +1,76 @@
+"""
+Import time of the package and each of its modules, measured with
+`python -X importtime` in a fresh interpreter where Django is already set
+up. The times include the Django REST framework modules they import.
+
+    python -m benchmarks.imports [--repeat 5]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+
+MODULES = (
+    'rest_framework_nested',
+    'rest_framework_nested.instrumentation',
+    'rest_framework_nested.lookups',
+    'rest_framework_nested.reverse',
+    'rest_framework_nested.urlpatterns',
+    'rest_framework_nested.routers',
+    'rest_framework_nested.relations',
+    'rest_framework_nested.serializers',
+    'rest_framework_nested.viewsets',
+    'rest_framework_nested.mixins',
+    'rest_framework_nested.pagination',
+)
+
+SETUP = (
+    'import django; '
+    'from django.conf import settings; '
+    "settings.configure(INSTALLED_APPS=['django.contrib.contenttypes', 'django.contrib.auth', 'rest_framework']); "
+    'django.setup()'
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_module(module: str) -> tuple[float, dict[str, float]]:
+    """
+    Imports `module` in a fresh interpreter. Returns its cumulative import
+    time, and the cumulative time of every module it imported, in seconds.
+    """
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'{SETUP}\nimport {module}'],
+        capture_output=True, text=True, check=True, cwd=ROOT,
+    )
+    imported: dict[str, float] = {}
+    for line in completed.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:'):
+            continue
+        _self, cumulative, name = line[len('import time:'):].split('|')
+        if cumulative.strip().isdigit():
+            imported[name.strip()] = int(cumulative) / 1e6
+    return imported[module], imported
+
+
+def run(modules: tuple[str, ...] = MODULES, repeat: int = 5) -> dict[str, float]:
+    return {
+        module: min(import_module(module)[0] for _ in range(repeat))
+        for module in modules
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    for module, seconds in run(repeat=args.repeat).items():
+        print(f'{module:>40}: {seconds * 1000:8.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Router construction at startup, for `levels` levels of nested routers
+under a root router registering `viewsets` viewsets.
+
+    python -m benchmarks.routers [--levels 4] [--viewsets 400]
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Any
+
+from benchmarks.settings import configure
+
+configure()
+
+from rest_framework.routers import SimpleRouter  # noqa: E402
+from rest_framework.viewsets import ViewSet  # noqa: E402
+
+from rest_framework_nested.routers import NestedSimpleRouter  # noqa: E402
+
+
+def make_viewset(name: str) -> type[ViewSet]:
+    def list(self: Any, request: Any, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    def retrieve(self: Any, request: Any, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    return type(name, (ViewSet,), {'list': list, 'retrieve': retrieve})
+
+
+def build_routers(levels: int, viewsets: int) -> list[Any]:
+    """
+    Build the router chain: the root router registers `viewsets` viewsets,
+    and every level below has one nested router per viewset of the level
+    above, each registering a single viewset.
+    """
+    viewset = make_viewset('BenchViewSet')
+    root = SimpleRouter()
+    for i in range(viewsets):
+        root.register(f'r{i}', viewset, basename=f'r{i}')
+
+    routers: list[Any] = [root]
+    parents = [(root, f'r{i}') for i in range(viewsets)]
+    for level in range(1, levels):
+        children = []
+        for parent, prefix in parents:
+            router = NestedSimpleRouter(parent, prefix, lookup=f'l{level}')
+            router.register(f'n{level}', viewset, basename=f'{prefix}-n{level}')
+            children.append((router, f'n{level}'))
+            routers.append(router)
+        parents = children
+    return routers
+
+
+def run(levels: int, viewsets: int, repeat: int = 5) -> dict[str, float]:
+    build_times, urls_times = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        routers = build_routers(levels, viewsets)
+        built = time.perf_counter()
+        for router in routers:
+            router.urls
+        done = time.perf_counter()
+        build_times.append(built - start)
+        urls_times.append(done - built)
+    return {
+        'construct': min(build_times),
+        'urls': min(urls_times),
+        'total': min(b + u for b, u in zip(build_times, urls_times)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--levels', type=int, default=4)
+    parser.add_argument('--viewsets', type=int, default=400)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    result = run(args.levels, args.viewsets, args.repeat)
+    for name, seconds in result.items():
+        print(f'{name:>10}: {seconds * 1000:8.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""
+`NestedHyperlinkedModelSerializer` list rendering, from the queryset to
+the JSON body.
+
+    python -m benchmarks.serializers
+"""
+from __future__ import annotations
+
+import json
+from typing import Sequence
+
+from benchmarks.fixtures import clear, create_grandchildren
+from benchmarks.timing import best_of
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from tests.serializers.models import GrandChild1, ParentChild2GrandChild1Serializer
+
+SIZES = (10, 1000, 10000)
+
+
+def run(sizes: Sequence[int] = SIZES, repeat: int = 3) -> dict[str, float]:
+    request = Request(APIRequestFactory().get('/'))
+    renderer = JSONRenderer()
+    results = {}
+    for rows in sizes:
+        child = create_grandchildren(rows)
+        queryset = GrandChild1.objects.filter(parent=child).select_related('parent')
+
+        def render() -> bytes:
+            serializer = ParentChild2GrandChild1Serializer(queryset.all(), many=True, context={'request': request})
+            return renderer.render(serializer.data)
+
+        results[str(rows)] = best_of(render, repeat)
+        clear()
+    return results
+
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=2))
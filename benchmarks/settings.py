@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+
+def configure() -> None:
+    """
+    Django settings of the test suite, with its models in an in-memory
+    SQLite database, unless already configured.
+    """
+    from django.conf import settings
+
+    if settings.configured:
+        return
+
+    from tests.conftest import pytest_configure
+    pytest_configure()
+
+    from django.test.utils import setup_test_environment
+    # allows the 'testserver' host of the request factories
+    setup_test_environment()
+
+    from django.core.management import call_command
+    # the test apps have no migrations, create their tables directly
+    call_command('migrate', run_syncdb=True, verbosity=0)
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Callable
+
+
+def best_of(func: Callable[[], Any], repeat: int = 5, number: int = 1) -> float:
+    """
+    Returns the best time, in seconds, of one call to `func`, out of
+    `repeat` rounds of `number` calls each.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
@@ -0,0 +1,33 @@
+"""
+URL resolving and reversing of the nested routes of the test suite.
+
+    python -m benchmarks.urls
+"""
+from __future__ import annotations
+
+import json
+
+from benchmarks.settings import configure
+from benchmarks.timing import best_of
+
+configure()
+
+from django.urls import resolve, reverse  # noqa: E402
+
+PATH = '/parent2/1/child2/2/grandchild1/3/'
+VIEW_NAME = 'grandchild1-detail'
+KWARGS = {'root_pk': 1, 'parent_pk': 2, 'pk': 3}
+
+
+def run(number: int = 10000, repeat: int = 5) -> dict[str, float]:
+    # fill the resolver caches first
+    resolve(PATH)
+    reverse(VIEW_NAME, kwargs=KWARGS)
+    return {
+        'resolve': best_of(lambda: resolve(PATH), repeat, number),
+        'reverse': best_of(lambda: reverse(VIEW_NAME, kwargs=KWARGS), repeat, number),
+    }
+
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=2))
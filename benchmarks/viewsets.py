@@ -0,0 +1,55 @@
+"""
+Request dispatch through a `NestedViewSetMixin` viewset, from the request
+to the rendered response.
+
+    python -m benchmarks.viewsets
+"""
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from benchmarks.fixtures import clear, create_grandchildren
+from benchmarks.timing import best_of
+
+from rest_framework.test import APIRequestFactory
+from rest_framework.viewsets import ModelViewSet
+
+from rest_framework_nested.viewsets import NestedViewSetMixin
+from tests.serializers.models import GrandChild1, ParentChild2GrandChild1Serializer
+
+
+class GrandChildViewSet(NestedViewSetMixin[GrandChild1], ModelViewSet):  # type: ignore[misc]
+    serializer_class = ParentChild2GrandChild1Serializer
+    queryset = GrandChild1.objects.all()
+
+
+def run(rows: int = 100, number: int = 50, repeat: int = 5) -> dict[str, float]:
+    factory = APIRequestFactory()
+    child = create_grandchildren(rows)
+    kwargs: dict[str, Any] = {'root_pk': str(child.root_id), 'parent_pk': str(child.pk)}
+    grandchild = GrandChild1.objects.filter(parent=child).first()
+    assert grandchild is not None
+
+    list_view = GrandChildViewSet.as_view({'get': 'list'})
+    detail_view = GrandChildViewSet.as_view({'get': 'retrieve'})
+    list_url = f'/parent2/{child.root_id}/child2/{child.pk}/grandchild1/'
+    detail_url = f'{list_url}{grandchild.pk}/'
+
+    def dispatch_list() -> Any:
+        return list_view(factory.get(list_url), **kwargs).render()
+
+    def dispatch_detail() -> Any:
+        return detail_view(factory.get(detail_url), pk=str(grandchild.pk), **kwargs).render()
+
+    try:
+        return {
+            f'list_{rows}': best_of(dispatch_list, repeat, number),
+            'retrieve': best_of(dispatch_detail, repeat, number),
+        }
+    finally:
+        clear()
+
+
+if __name__ == '__main__':
+    print(json.dumps(run(), indent=2))
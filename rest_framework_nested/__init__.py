@@ -12,4 +12,68 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+"""
+The public classes are importable from the package, e.g.
+`from rest_framework_nested import NestedSimpleRouter`. Their modules are
+only imported on first access, so importing the package, or one of its
+modules, does not pull in the others.
+"""
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
 __version__ = '0.95.3'
+
+if TYPE_CHECKING:
+    # for type checkers, see __getattr__
+    from rest_framework_nested.mixins import BulkWriteMixin, ConditionalListMixin, ParentCacheMixin, StreamingListMixin  # noqa: F401
+    from rest_framework_nested.pagination import MissingIndexWarning, NestedCursorPagination  # noqa: F401
+    from rest_framework_nested.relations import (  # noqa: F401
+        AsyncNestedHyperlinkedIdentityField, AsyncNestedHyperlinkedRelatedField, NestedHyperlinkedIdentityField,
+        NestedHyperlinkedRelatedField,
+    )
+    from rest_framework_nested.routers import NestedDefaultRouter, NestedMixin, NestedSimpleRouter, RouteEntry  # noqa: F401
+    from rest_framework_nested.serializers import (  # noqa: F401
+        NestedHyperlinkedListSerializer, NestedHyperlinkedModelSerializer, NestedValuesListSerializer,
+    )
+    from rest_framework_nested.viewsets import AsyncNestedViewSetMixin, NestedViewSetMixin  # noqa: F401
+
+# public name -> module
+_exports = {
+    'BulkWriteMixin': 'mixins',
+    'ConditionalListMixin': 'mixins',
+    'ParentCacheMixin': 'mixins',
+    'StreamingListMixin': 'mixins',
+    'MissingIndexWarning': 'pagination',
+    'NestedCursorPagination': 'pagination',
+    'AsyncNestedHyperlinkedIdentityField': 'relations',
+    'AsyncNestedHyperlinkedRelatedField': 'relations',
+    'NestedHyperlinkedIdentityField': 'relations',
+    'NestedHyperlinkedRelatedField': 'relations',
+    'NestedDefaultRouter': 'routers',
+    'NestedMixin': 'routers',
+    'NestedSimpleRouter': 'routers',
+    'RouteEntry': 'routers',
+    'NestedHyperlinkedListSerializer': 'serializers',
+    'NestedHyperlinkedModelSerializer': 'serializers',
+    'NestedValuesListSerializer': 'serializers',
+    'AsyncNestedViewSetMixin': 'viewsets',
+    'NestedViewSetMixin': 'viewsets',
+}
+
+__all__ = ['__version__', *_exports]
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module = _exports[name]
+    except KeyError:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}') from None
+    value = getattr(import_module(f'{__name__}.{module}'), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_exports})
@@ -0,0 +1,166 @@
+"""
+Optional counters and timers for the hot paths of nested resources.
+
+Nothing is recorded unless stats are being collected, either for a block of
+code:
+
+    from rest_framework_nested.instrumentation import collect
+
+    with collect() as stats:
+        serializer.data
+    stats.counters  # {'reverse': 100, 'getattr_hops': 200, 'lazy_loads': 100}
+
+or for every request, with the middleware:
+
+    MIDDLEWARE = [
+        ...
+        'rest_framework_nested.instrumentation.InstrumentationMiddleware',
+    ]
+    # callables receiving (stats, request), default: the logging sink
+    DRF_NESTED_INSTRUMENTATION_SINKS = [
+        'rest_framework_nested.instrumentation.signal_sink',
+    ]
+
+Recorded names:
+
+    reverse         URLs built by the hyperlinked fields
+    url_template    ... of which from a precompiled URL template
+    getattr_hops    attributes followed to read the parent lookups
+    lazy_loads      ... of which loaded a related object from the database
+    get_object      queries looking up submitted hyperlinks
+    parent_filter   parent filters built by `NestedViewSetMixin.get_queryset`
+    parent_exists   parent existence checks run by `NestedViewSetMixin`
+
+Every timed name is also counted, with the time in seconds in `timers`.
+"""
+from __future__ import annotations
+
+import contextlib
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, ContextManager, Iterator, TypeVar
+
+from django.conf import settings
+from django.dispatch import Signal
+from django.http import HttpRequest, HttpResponse
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+Sink = Callable[['Stats', Any], None]
+
+# Sent by `signal_sink`, with the `stats` and the `request`.
+stats_collected = Signal()
+
+
+class Stats:
+    """
+    Counters and timers collected for one request, or one `collect()` block.
+    """
+    __slots__ = ('counters', 'timers')
+
+    def __init__(self) -> None:
+        self.counters: dict[str, int] = {}
+        self.timers: dict[str, float] = {}
+
+    def incr(self, name: str, value: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def record(self, name: str, seconds: float) -> None:
+        """
+        Counts one `name` event, lasting `seconds`.
+        """
+        self.incr(name)
+        self.timers[name] = self.timers.get(name, 0.0) + seconds
+
+    @contextlib.contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        return {'counters': dict(self.counters), 'timers': dict(self.timers)}
+
+
+_stats: ContextVar[Stats | None] = ContextVar('rest_framework_nested_stats', default=None)
+
+
+def get_stats() -> Stats | None:
+    """
+    Returns the stats being collected, or `None` when disabled.
+    """
+    return _stats.get()
+
+
+def incr(name: str, value: int = 1) -> None:
+    stats = _stats.get()
+    if stats is not None:
+        stats.incr(name, value)
+
+
+def timer(name: str) -> ContextManager[None]:
+    stats = _stats.get()
+    if stats is None:
+        return contextlib.nullcontext()
+    return stats.timer(name)
+
+
+def timed(name: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Returns `func(*args, **kwargs)`, recording the call as `name`.
+    """
+    stats = _stats.get()
+    if stats is None:
+        return func(*args, **kwargs)
+    start = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        stats.record(name, time.perf_counter() - start)
+
+
+@contextlib.contextmanager
+def collect(*sinks: Sink, request: Any = None) -> Iterator[Stats]:
+    """
+    Collects the stats of the block, then hands them to `sinks`.
+    """
+    stats = Stats()
+    token = _stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _stats.reset(token)
+        for sink in sinks:
+            sink(stats, request)
+
+
+def logging_sink(stats: Stats, request: Any) -> None:
+    if not stats.counters:
+        return
+    where = f'{request.method} {request.path}' if request is not None else 'block'
+    logger.info('%s: %s', where, stats.as_dict(), extra={'nested_stats': stats.as_dict()})
+
+
+def signal_sink(stats: Stats, request: Any) -> None:
+    stats_collected.send(sender=Stats, stats=stats, request=request)
+
+
+class InstrumentationMiddleware:
+    """
+    Collects the stats of every request, and hands them to the sinks listed
+    in the `DRF_NESTED_INSTRUMENTATION_SINKS` setting.
+    """
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+        sinks = getattr(settings, 'DRF_NESTED_INSTRUMENTATION_SINKS', [logging_sink])
+        self.sinks: list[Sink] = [import_string(sink) if isinstance(sink, str) else sink for sink in sinks]
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        with collect(*self.sinks, request=request):
+            return self.get_response(request)
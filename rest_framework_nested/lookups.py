@@ -0,0 +1,250 @@
+"""
+Helpers to resolve `parent_lookup_kwargs` paths, like 'parent__root__pk',
+against the models they traverse.
+"""
+from __future__ import annotations
+
+from functools import lru_cache, reduce
+from operator import attrgetter
+from typing import Any, Callable, Sequence
+
+from django.core.exceptions import FieldDoesNotExist, ObjectDoesNotExist
+from django.db.models import Field, ForeignKey, ForeignObjectRel, Model
+
+from rest_framework_nested.instrumentation import Stats, get_stats
+
+LOOKUP_SEP = '__'
+
+
+def get_relation(model: type[Model], name: str) -> Field[Any, Any] | ForeignObjectRel | None:
+    """
+    Return the relation `name` of `model`, or `None` if `name` is not a
+    relation to another model.
+    """
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+    if not field.is_relation or field.related_model is None:
+        return None
+    return field
+
+
+@lru_cache(maxsize=None)
+def get_fk_attname(model: Any, name: str, attr: str) -> str | None:
+    """
+    Return the local attribute holding `instance.<name>.<attr>` without
+    loading the related instance, e.g. 'parent_id' for ('parent', 'pk').
+    """
+    if not (isinstance(model, type) and issubclass(model, Model)):
+        return None
+    field = get_relation(model, name)
+    if not isinstance(field, ForeignKey):
+        return None
+    related_pk = field.related_model._meta.pk
+    if related_pk is None or field.target_field != related_pk:
+        return None
+    if attr not in ('pk', related_pk.name, related_pk.attname):
+        return None
+    return field.attname
+
+
+def get_lookup_value(obj: Any, lookups: Sequence[str]) -> Any:
+    """
+    Follow `lookups` from `obj`, like `reduce(getattr, [obj] + lookups)`,
+    but read a trailing `<fk>__pk` from the local `<fk>_id` attribute.
+
+    Raises `AttributeError` when the path can not be followed.
+    """
+    stats = get_stats()
+    if len(lookups) >= 2:
+        holder = _follow(obj, lookups[:-2], stats)
+        attname = get_fk_attname(holder.__class__, lookups[-2], lookups[-1])
+        if attname is not None:
+            value = getattr(holder, attname)
+            if value is not None:
+                return value
+    return _follow(obj, lookups, stats)
+
+
+def compile_lookup(model: type[Model], lookups: Sequence[str]) -> Callable[[Any], Any] | None:
+    """
+    Compile `lookups` into a function returning `get_lookup_value(obj,
+    lookups)` for instances of `model`, with one `operator.attrgetter` that
+    reads a trailing `<fk>__pk` from `<fk>_id`.
+
+    Returns `None` if `lookups` does not follow relations of `model` and
+    end on one of its attributes, e.g. an annotation, which can only be
+    told when reading it.
+    """
+    relations, name = list(lookups[:-1]), lookups[-1]
+    followed = follow_relations(model, relations)
+    if followed is None or followed[1]:
+        return None
+    path = list(lookups)
+    attname = None
+    if relations:
+        holder = follow_relations(model, relations[:-1])
+        attname = get_fk_attname(holder[0], relations[-1], name) if holder is not None else None
+        if attname is not None:
+            path[-2:] = [attname]
+    if attname is None and not hasattr(followed[0], name):
+        return None
+
+    getter = attrgetter('.'.join(path))
+
+    def get_value(obj: Any) -> Any:
+        if get_stats() is not None:
+            return get_lookup_value(obj, lookups)
+        value = getter(obj)
+        if value is None and attname is not None:
+            # no <fk>_id, follow the relation like get_lookup_value()
+            return get_lookup_value(obj, lookups)
+        return value
+    return get_value
+
+
+def _follow(obj: Any, names: Sequence[str], stats: Stats | None) -> Any:
+    if stats is None:
+        return reduce(getattr, names, obj)
+    for name in names:
+        stats.incr('getattr_hops')
+        if _is_lazy_load(obj, name):
+            stats.incr('lazy_loads')
+        obj = getattr(obj, name)
+    return obj
+
+
+async def aload_lookup_path(obj: Any, lookups: Sequence[str]) -> None:
+    """
+    Load, with the async ORM, the related objects `get_lookup_value(obj,
+    lookups)` would query, so it can then be called on the event loop
+    without raising `SynchronousOnlyOperation`.
+
+    Stops silently where the path can not be followed.
+    """
+    holder = obj
+    for index, name in enumerate(lookups):
+        if index == len(lookups) - 2:
+            attname = get_fk_attname(holder.__class__, name, lookups[-1])
+            if attname is not None and getattr(holder, attname, None) is not None:
+                return
+        if _is_lazy_load(holder, name) and not await _aload_relation(holder, name):
+            return
+        try:
+            holder = getattr(holder, name)
+        except (AttributeError, ObjectDoesNotExist):
+            return
+
+
+async def _aload_relation(holder: Model, name: str) -> bool:
+    """
+    Load and cache the single related object `holder.<name>`, like its
+    descriptor does on access. Returns False if it does not exist.
+    """
+    field: Any = holder._meta.get_field(name)
+    descriptor = getattr(holder.__class__, name)
+    if isinstance(field, ForeignObjectRel):
+        # reverse one-to-one, cached as None when missing
+        try:
+            related = await descriptor.get_queryset(instance=holder).aget(**{field.field.name: holder})
+        except field.related_model.DoesNotExist:
+            related = None
+        else:
+            field.field.set_cached_value(related, holder)
+        field.set_cached_value(holder, related)
+        return True
+
+    try:
+        related = await descriptor.get_queryset(instance=holder).aget(field.get_reverse_related_filter(holder))
+    except field.related_model.DoesNotExist:
+        return False
+    field.set_cached_value(holder, related)
+    if not field.remote_field.multiple:
+        field.remote_field.set_cached_value(related, holder)
+    return True
+
+
+def _is_lazy_load(holder: Any, name: str) -> bool:
+    """
+    Whether reading `holder.<name>` loads a related object from the database.
+    """
+    opts = getattr(holder, '_meta', None)
+    if opts is None:
+        return False
+    try:
+        field = opts.get_field(name)
+    except FieldDoesNotExist:
+        return False
+    if not field.is_relation or field.many_to_many or field.one_to_many:
+        return False
+    if isinstance(field, ForeignKey) and getattr(holder, field.attname) is None:
+        return False
+    is_cached = getattr(field, 'is_cached', None)
+    return is_cached is not None and not is_cached(holder)
+
+
+def follow_relations(model: type[Model], relations: Sequence[str]) -> tuple[type[Model], bool] | None:
+    """
+    Return the model reached by following `relations` from `model`, and
+    whether any of them is multi-valued. Returns `None` if one of them is
+    not a relation.
+    """
+    many = False
+    for name in relations:
+        field = get_relation(model, name)
+        if field is None:
+            return None
+        many = many or bool(field.many_to_many or field.one_to_many)
+        model = field.related_model  # type: ignore[assignment]
+    return model, many
+
+
+def get_related_path(model: type[Model], lookups: Sequence[str]) -> tuple[list[str], bool] | None:
+    """
+    Return the relations that have to be loaded to read `lookups` from an
+    instance of `model`, and whether any of them is multi-valued.
+
+    A trailing `<fk>__pk` is served by `<fk>_id`, so `<fk>` is not loaded.
+    Returns `None` if `lookups` does not follow relations of `model`.
+    """
+    relations = list(lookups[:-1])
+    if relations:
+        holder = follow_relations(model, relations[:-1])
+        if holder is None:
+            return None
+        if get_fk_attname(holder[0], relations[-1], lookups[-1]) is not None:
+            relations.pop()
+
+    followed = follow_relations(model, relations)
+    if followed is None:
+        return None
+    return relations, followed[1]
+
+
+@lru_cache(maxsize=None)
+def get_lookup_field(model: Any, lookup: str) -> Field[Any, Any] | None:
+    """
+    Return the concrete field a `parent_lookup_kwargs` path like
+    'parent__root__pk' filters on, following foreign keys to the field they
+    point to. Returns `None` if the path does not end on a field, e.g. when
+    it uses a lookup like '__iexact'.
+    """
+    *relations, name = lookup.split(LOOKUP_SEP)
+    followed = follow_relations(model, relations)
+    if followed is None:
+        return None
+    opts = followed[0]._meta
+    field: Any
+    if name == 'pk':
+        field = opts.pk
+    else:
+        try:
+            field = opts.get_field(name)
+        except FieldDoesNotExist:
+            return None
+    while isinstance(field, ForeignKey):
+        field = field.target_field
+    if not isinstance(field, Field) or field.is_relation:
+        return None
+    return field
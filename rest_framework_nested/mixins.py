@@ -0,0 +1,457 @@
+"""
+Viewset mixins for nested resources.
+"""
+from __future__ import annotations
+
+import hashlib
+import time
+from functools import partial
+from typing import Any, Callable, Iterable, Iterator
+from urllib import parse
+
+from django.core.cache import BaseCache, caches
+from django.core.exceptions import ImproperlyConfigured, ObjectDoesNotExist, ValidationError as DjangoValidationError
+from django.db import router, transaction
+from django.db.models import Count, Max, Model, QuerySet
+from django.http import HttpResponseBase, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from rest_framework import status
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.permissions import BasePermission
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.serializers import BaseSerializer
+
+from rest_framework_nested.lookups import get_relation
+from rest_framework_nested.viewsets import NestedViewSetMixin
+
+
+class StreamingListMixin:
+    """
+    Streams the JSON array of the `list` action row by row, iterating the
+    queryset in chunks, so memory stays flat however many rows there are.
+
+    Goes with `NestedViewSetMixin` and a `ListModelMixin` based viewset:
+
+        class NameserverViewSet(StreamingListMixin, NestedViewSetMixin, viewsets.ModelViewSet):
+            ...
+
+    Paginated pages and renderers other than JSON are rendered as usual.
+    Rows are serialized by the serializer itself, not its `ListSerializer`,
+    and errors raised while streaming can not become error responses.
+    """
+    # rows fetched from the database, and sent, at once
+    stream_chunk_size = 1000
+
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Response | StreamingHttpResponse:
+        renderer = request.accepted_renderer
+        if not isinstance(renderer, JSONRenderer):
+            return super().list(request, *args, **kwargs)  # type: ignore[misc]
+
+        queryset = self.filter_queryset(self.get_queryset())  # type: ignore[attr-defined]
+        page = self.paginate_queryset(queryset)  # type: ignore[attr-defined]
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)  # type: ignore[attr-defined]
+            return self.get_paginated_response(serializer.data)  # type: ignore[attr-defined]
+
+        if isinstance(queryset, QuerySet):
+            rows: Iterable[Any] = queryset.iterator(chunk_size=self.stream_chunk_size)
+        else:
+            rows = queryset
+
+        response = StreamingHttpResponse(
+            self._stream_rows(rows, self.get_serializer(), renderer, request.accepted_media_type),  # type: ignore[attr-defined]
+            content_type=renderer.media_type,
+        )
+        response['Vary'] = 'Accept'
+        return response
+
+    def _stream_rows(
+        self, rows: Iterable[Any], serializer: BaseSerializer[Any], renderer: JSONRenderer, media_type: str,
+    ) -> Iterator[bytes]:
+        renderer_context = self.get_renderer_context()  # type: ignore[attr-defined]
+        separator = b''
+        chunk = [b'[']
+        for count, row in enumerate(rows, 1):
+            data = serializer.to_representation(row)
+            chunk.append(separator + renderer.render(data, media_type, renderer_context))
+            separator = b','
+            if count % self.stream_chunk_size == 0:
+                yield b''.join(chunk)
+                chunk = []
+        chunk.append(b']')
+        yield b''.join(chunk)
+
+
+class ParentCacheMixin:
+    """
+    Caches the data of the `list` and `retrieve` actions of a
+    `NestedViewSetMixin` viewset, per parent, in a Django cache:
+
+        class NameserverViewSet(ParentCacheMixin, NestedViewSetMixin, viewsets.ModelViewSet):
+            cache_timeout = 60
+
+    The cache keys hold a version counter of the parents in the URL, bumped
+    when `perform_create`, `perform_update` or `perform_destroy` commit, so
+    every cached response of those parents expires at once, without
+    scanning keys. The counter is shared by the `ParentCacheMixin` views
+    filtering the same model on the same parents, other writes, or writes
+    to the parents themselves, do not expire them.
+
+    The cached data is the same for every user, override
+    `get_response_cache_key()` when it depends on the request. A cached
+    detail is still fetched with `get_object()` when a permission of the
+    view checks objects, so `check_object_permissions()` runs on every
+    request.
+    """
+    cache_alias = 'default'
+    # seconds, `None` to keep the responses until their parents change
+    cache_timeout: int | None = 300
+
+    def get_cache(self) -> BaseCache:
+        return caches[self.cache_alias]
+
+    def get_parent_cache_key(self) -> str:
+        """
+        Returns the key of the version counter of the parents in the URL,
+        built from the model and the parent filters of its queryset, so
+        views filtering on other lookups never share it.
+        """
+        model = super(NestedViewSetMixin, self).get_queryset().model  # type: ignore[misc]
+        values = self._get_parent_lookup_values(model)  # type: ignore[attr-defined]
+        parents = sorted((lookup.orm_path, str(values[lookup.url_kwarg])) for lookup in self._get_parent_lookup_plan(model))  # type: ignore[attr-defined]
+        return f'rest_framework_nested:{model._meta.label_lower}:{parse.urlencode(parents)}'
+
+    def get_parent_version(self, cache: BaseCache, parent_key: str) -> int | None:
+        """
+        Returns the version counter of the parents in the URL, or `None`
+        when the cache does not keep it, e.g. `DummyCache`.
+        """
+        version = cache.get(parent_key)
+        if version is None:
+            # start from the clock, so a counter evicted from the cache does
+            # not reuse the versions of responses that are still cached
+            cache.add(parent_key, time.time_ns() // 1000, None)
+            version = cache.get(parent_key)
+        return None if version is None else int(version)
+
+    def bump_parent_version(self, parent_key: str | None = None) -> None:
+        """
+        Expires every cached response of the parents in the URL.
+        """
+        cache = self.get_cache()
+        if parent_key is None:
+            parent_key = self.get_parent_cache_key()
+        try:
+            cache.incr(parent_key)
+        except ValueError:
+            # not cached, neither are the responses
+            pass
+
+    def get_response_cache_key(self, request: Request, parent_key: str, version: int) -> str:
+        path = hashlib.md5(request.get_full_path().encode(), usedforsecurity=False).hexdigest()
+        basename = getattr(self, 'basename', None) or type(self).__qualname__
+        return f'{parent_key}:{version}:{basename}:{self.action}:{path}'  # type: ignore[attr-defined]
+
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Any:
+        return self._cached_response(super().list, request, args, kwargs)  # type: ignore[misc]
+
+    def retrieve(self, request: Request, *args: Any, **kwargs: Any) -> Any:
+        return self._cached_response(super().retrieve, request, args, kwargs, check_object=True)  # type: ignore[misc]
+
+    def _has_object_permissions(self) -> bool:
+        """
+        Returns whether a permission of the view checks the objects, which
+        a cached detail must pass too.
+        """
+        return any(
+            type(permission).has_object_permission is not BasePermission.has_object_permission
+            for permission in self.get_permissions()  # type: ignore[attr-defined]
+        )
+
+    def _cached_response(
+        self, action: Callable[..., Any], request: Request, args: tuple[Any, ...], kwargs: dict[str, Any], check_object: bool = False,
+    ) -> Any:
+        cache = self.get_cache()
+        parent_key = self.get_parent_cache_key()
+        version = self.get_parent_version(cache, parent_key)
+        if version is None:
+            return action(request, *args, **kwargs)
+        key = self.get_response_cache_key(request, parent_key, version)
+        data = cache.get(key)
+        if data is not None:
+            if check_object and self._has_object_permissions():
+                # runs check_object_permissions()
+                self.get_object()  # type: ignore[attr-defined]
+            return Response(data)
+
+        response = action(request, *args, **kwargs)
+        if isinstance(response, Response) and response.status_code == 200:
+            cache.set(key, response.data, self.cache_timeout)
+        return response
+
+    def _bump_on_commit(self, instance: Any) -> None:
+        # bumped before the commit, a concurrent request could cache the
+        # old rows under the new version
+        using = router.db_for_write(type(instance), instance=instance)
+        transaction.on_commit(partial(self.bump_parent_version, self.get_parent_cache_key()), using=using)
+
+    def perform_create(self, serializer: BaseSerializer[Any]) -> None:
+        super().perform_create(serializer)  # type: ignore[misc]
+        self._bump_on_commit(serializer.instance)
+
+    def perform_update(self, serializer: BaseSerializer[Any]) -> None:
+        super().perform_update(serializer)  # type: ignore[misc]
+        self._bump_on_commit(serializer.instance)
+
+    def perform_destroy(self, instance: Model) -> None:
+        super().perform_destroy(instance)  # type: ignore[misc]
+        self._bump_on_commit(instance)
+
+
+class ConditionalListMixin:
+    """
+    Answers the `list` action with `304 Not Modified` when the collection
+    matches the `If-None-Match` of the request, before anything is
+    serialized:
+
+        class NameserverViewSet(ConditionalListMixin, NestedViewSetMixin, viewsets.ModelViewSet):
+            last_modified_field = 'updated_at'
+
+    The `ETag` is computed from the count of the filtered rows and the
+    latest `last_modified_field`, in one aggregate query, so the field must
+    change on every update, e.g. with `auto_now=True`. Without it, the
+    viewset must have the version counter of `ParentCacheMixin`, used with
+    no query at all.
+
+    No `Last-Modified` is sent: the latest modification time of the rows
+    left does not change when one is deleted.
+    """
+    last_modified_field: str | None = None
+
+    def get_collection_fingerprint(self, queryset: QuerySet[Any]) -> Any:
+        """
+        Returns values that change with the collection, or `None` when
+        they are not known.
+        """
+        if self.last_modified_field is not None:
+            values = queryset.order_by().aggregate(count=Count('pk'), latest=Max(self.last_modified_field))
+            return values['count'], values['latest']
+        if hasattr(self, 'get_parent_version'):
+            return self.get_parent_version(self.get_cache(), self.get_parent_cache_key())  # type: ignore[attr-defined]
+        raise ImproperlyConfigured(
+            f'{type(self).__name__} needs a `last_modified_field` updated on every change, or ParentCacheMixin, '
+            f'to tell when the collection changed.'
+        )
+
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Any:
+        queryset = self.filter_queryset(self.get_queryset())  # type: ignore[attr-defined]
+        fingerprint = self.get_collection_fingerprint(queryset)
+        if fingerprint is None:
+            # no version counter kept by the cache
+            return super().list(request, *args, **kwargs)  # type: ignore[misc]
+        # the same collection is rendered differently by page, filters and
+        # media type
+        representation = (fingerprint, request.get_full_path(), request.accepted_media_type)
+        etag = '"%s"' % hashlib.md5(repr(representation).encode(), usedforsecurity=False).hexdigest()
+
+        response: HttpResponseBase | None = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().list(request, *args, **kwargs)  # type: ignore[misc]
+            assert response is not None
+            if response.status_code != 200:
+                return response
+        response.headers.setdefault('ETag', etag)
+        return response
+
+
+class BulkWriteMixin:
+    """
+    Bulk writes of the children of one parent, for `NestedViewSetMixin`
+    viewsets, each in one transaction:
+
+        POST   <list url>  [{...}, ...]             bulk_create()
+        PUT    <list url>  [{"id": 1, ...}, ...]    bulk_update()
+        PATCH  <list url>  [{"id": 1, ...}, ...]    partial_bulk_update()
+        DELETE <list url>  [1, 2, ...]              bulk_destroy()
+
+    The nested routers map the list route to these actions.
+
+    Items are validated by the serializer without the fields of the parents,
+    which are taken from the URL, looked up once, and can not be changed.
+    Updates and deletes of rows that are not found under these parents, or
+    listed twice, fail with a 400 keyed by the index of the item, and rows
+    denied by `check_object_permissions()` fail the whole request.
+    Rows are then written with `bulk_create()`, `bulk_update()` and
+    `filter(...).delete()` in batches of `bulk_batch_size`, skipping
+    `save()`, `perform_*()` and the model signals sent by them. Writing
+    many-to-many relations is not supported.
+    """
+    # the item key, and model field, identifying the rows to update or delete
+    bulk_lookup_field = 'id'
+    bulk_batch_size = 1000
+
+    def create(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        data: Any = request.data
+        if isinstance(data, list):
+            return self.bulk_create(request, *args, **kwargs)
+        return super().create(request, *args, **kwargs)  # type: ignore[misc]
+
+    def bulk_create(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        model = self._get_bulk_model()
+        with transaction.atomic(using=router.db_for_write(model)):
+            parents = self.get_bulk_parents(model)
+            serializer = self.get_serializer(data=request.data, many=True)  # type: ignore[attr-defined]
+            for parent_arg in parents:
+                serializer.child.fields.pop(parent_arg, None)
+            if not serializer.is_valid():
+                errors = serializer.errors
+                if isinstance(errors, list):
+                    # keyed by the index of the item, as in DRF >= 3.15
+                    errors = {str(index): item_errors for index, item_errors in enumerate(errors) if item_errors}
+                raise ValidationError(errors)
+
+            instances = [model(**attrs, **parents) for attrs in serializer.validated_data]
+            model._default_manager.bulk_create(instances, batch_size=self.bulk_batch_size)
+            self._bulk_written(model)
+        data = self.get_serializer(instances, many=True).data  # type: ignore[attr-defined]
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    def bulk_update(self, request: Request, *args: Any, partial: bool = False, **kwargs: Any) -> Response:
+        model = self._get_bulk_model()
+        items = self._get_bulk_items(request.data)
+        key = self.bulk_lookup_field
+        parent_args = self._get_parent_args(model)
+        with transaction.atomic(using=router.db_for_write(model)):
+            values = [self._to_bulk_lookup_value(model, item.get(key) if isinstance(item, dict) else None) for item in items]
+            queryset = self.filter_queryset(self.get_queryset())  # type: ignore[attr-defined]
+            instances = queryset.in_bulk([value for value in values if value is not None], field_name=key)
+
+            # keyed by the index of the item, like the ListSerializer errors
+            errors = self._get_duplicate_errors(values)
+            updated = []
+            fields: dict[str, None] = {}
+            for index, (item, value) in enumerate(zip(items, values)):
+                instance = instances.get(value)
+                if instance is None:
+                    errors[str(index)] = {key: [NotFound.default_detail]}
+                    continue
+                if str(index) in errors:
+                    continue
+                self.check_object_permissions(request, instance)  # type: ignore[attr-defined]
+                serializer = self.get_serializer(instance, data=item, partial=partial)  # type: ignore[attr-defined]
+                for parent_arg in parent_args:
+                    serializer.fields.pop(parent_arg, None)
+                if not serializer.is_valid():
+                    errors[str(index)] = serializer.errors
+                    continue
+                for attr, attr_value in serializer.validated_data.items():
+                    setattr(instance, attr, attr_value)
+                    fields[attr] = None
+                updated.append(instance)
+            if errors:
+                raise ValidationError(errors)
+
+            if fields:
+                model._default_manager.bulk_update(updated, list(fields), batch_size=self.bulk_batch_size)
+            self._bulk_written(model)
+        return Response(self.get_serializer(updated, many=True).data)  # type: ignore[attr-defined]
+
+    def partial_bulk_update(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        return self.bulk_update(request, *args, partial=True, **kwargs)
+
+    def bulk_destroy(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        model = self._get_bulk_model()
+        values = [self._to_bulk_lookup_value(model, value) for value in self._get_bulk_items(request.data)]
+        key = self.bulk_lookup_field
+        errors: dict[str, Any] = {str(index): {key: ['Invalid value.']} for index, value in enumerate(values) if value is None}
+        if errors:
+            raise ValidationError(errors)
+        with transaction.atomic(using=router.db_for_write(model)):
+            queryset = self.filter_queryset(self.get_queryset())  # type: ignore[attr-defined]
+            queryset = queryset.filter(**{f'{key}__in': values})
+            # like bulk_update(), unknown rows, or rows of other parents,
+            # fail the whole request
+            instances = queryset.in_bulk(values, field_name=key)
+            errors = self._get_duplicate_errors(values)
+            for index, value in enumerate(values):
+                if value not in instances:
+                    errors[str(index)] = {key: [NotFound.default_detail]}
+            if errors:
+                raise ValidationError(errors)
+            for instance in instances.values():
+                self.check_object_permissions(request, instance)  # type: ignore[attr-defined]
+            queryset.delete()
+            self._bulk_written(model)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def get_bulk_parents(self, model: type[Model]) -> dict[str, Model]:
+        """
+        Returns the parents in the URL, keyed by the model field they fill,
+        with one query per field. Raises `NotFound` when one does not exist.
+        """
+        groups: dict[str, dict[str, Any]] = {}
+        values = self._get_parent_lookup_values(model)  # type: ignore[attr-defined]
+        for lookup in self._get_parent_lookup_plan(model):  # type: ignore[attr-defined]
+            groups.setdefault(lookup.parent_arg, {})[lookup.parent_filter] = values[lookup.url_kwarg]
+
+        parents = {}
+        for parent_arg in self._get_parent_args(model):
+            relation = get_relation(model, parent_arg)
+            assert relation is not None and relation.related_model is not None
+            try:
+                parents[parent_arg] = relation.related_model._default_manager.get(**groups[parent_arg])
+            except (ObjectDoesNotExist, ValueError, TypeError):
+                raise NotFound()
+        return parents
+
+    def _get_parent_args(self, model: type[Model]) -> list[str]:
+        """
+        Returns the fields of `model` pointing to the parents in the URL.
+        """
+        parent_args: dict[str, None] = {}
+        for lookup in self._get_parent_lookup_plan(model):  # type: ignore[attr-defined]
+            relation = get_relation(model, lookup.parent_arg)
+            if relation is not None and relation.concrete and not relation.many_to_many:
+                parent_args[lookup.parent_arg] = None
+        return list(parent_args)
+
+    def _get_bulk_model(self) -> type[Model]:
+        return self.get_queryset().model  # type: ignore[attr-defined]
+
+    def _get_bulk_items(self, data: Any) -> list[Any]:
+        if not isinstance(data, list) or not data:
+            raise ValidationError({'non_field_errors': ['Expected a non-empty list of items.']})
+        return data
+
+    def _to_bulk_lookup_value(self, model: type[Model], value: Any) -> Any:
+        if value is None:
+            return None
+        try:
+            return model._meta.get_field(self.bulk_lookup_field).to_python(value)  # type: ignore[union-attr]
+        except DjangoValidationError:
+            return None
+
+    def _get_duplicate_errors(self, values: list[Any]) -> dict[str, Any]:
+        """
+        Returns the errors of the items repeating the lookup value of an
+        earlier one, keyed by their index.
+        """
+        errors: dict[str, Any] = {}
+        seen = set()
+        for index, value in enumerate(values):
+            if value is None:
+                continue
+            if value in seen:
+                errors[str(index)] = {self.bulk_lookup_field: ['Duplicate value.']}
+            seen.add(value)
+        return errors
+
+    def _bulk_written(self, model: type[Model]) -> None:
+        if hasattr(self, 'bump_parent_version'):
+            # expire the responses cached by ParentCacheMixin
+            transaction.on_commit(
+                partial(self.bump_parent_version, self.get_parent_cache_key()),  # type: ignore[attr-defined]
+                using=router.db_for_write(model),
+            )
@@ -0,0 +1,142 @@
+"""
+Pagination for nested list views.
+"""
+from __future__ import annotations
+
+import hashlib
+import warnings
+from base64 import b64decode, b64encode
+from typing import Any
+from urllib import parse
+from weakref import WeakKeyDictionary
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Model, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+from rest_framework.request import Request
+from rest_framework.utils.urls import replace_query_param
+
+from rest_framework_nested.lookups import get_relation
+
+
+class MissingIndexWarning(RuntimeWarning):
+    pass
+
+
+# view class -> models whose index was checked
+_checked_indexes: WeakKeyDictionary[type[Any], set[type[Model]]] = WeakKeyDictionary()
+
+
+class NestedCursorPagination(CursorPagination):
+    """
+    A `CursorPagination` for views using `NestedViewSetMixin`.
+
+    Within one parent, `WHERE parent_id = %s AND <ordering> > %s` costs the
+    same on every page given an index on the parent foreign keys followed by
+    the ordering, see `get_index_fields()`. A `MissingIndexWarning` is issued
+    once per view and model when the model has none.
+
+    Cursors are bound to the parents of the URL they were issued for, and
+    rejected as invalid for other parents.
+    """
+    ordering = 'pk'
+    warn_missing_index = True
+
+    def paginate_queryset(self, queryset: QuerySet[Any], request: Request, view: Any = None) -> list[Any] | None:
+        self.parent_scope = self.get_parent_scope(view)
+        if self.warn_missing_index and view is not None:
+            self.check_index(queryset.model, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_parent_scope(self, view: Any) -> str:
+        """
+        Returns a short digest of the parent URL kwargs of `view`.
+        """
+        if view is None or not hasattr(view, '_get_parent_lookup_kwargs'):
+            return ''
+        kwargs = getattr(view, 'kwargs', {})
+        values = sorted((url_kwarg, str(kwargs.get(url_kwarg))) for url_kwarg in view._get_parent_lookup_kwargs())
+        return hashlib.blake2b(parse.urlencode(values).encode(), digest_size=6).hexdigest()
+
+    def get_index_fields(self, model: type[Model], request: Request, view: Any) -> list[str]:
+        """
+        Returns the fields of the index serving the pages of `view`: the
+        foreign keys to the parents, then the ordering.
+        """
+        fields: list[str] = []
+        if hasattr(view, '_get_parent_lookup_plan'):
+            for lookup in view._get_parent_lookup_plan(model):
+                relation = get_relation(model, lookup.parent_arg)
+                if relation is not None and relation.concrete and lookup.parent_arg not in fields:
+                    fields.append(lookup.parent_arg)
+        for order in self.get_ordering(request, model._default_manager.none(), view):
+            if order.lstrip('-') == 'pk' and model._meta.pk is not None:
+                order = order.replace('pk', model._meta.pk.name)
+            fields.append(order)
+        return fields
+
+    def check_index(self, model: type[Model], request: Request, view: Any) -> None:
+        checked = _checked_indexes.setdefault(type(view), set())
+        if model in checked:
+            return
+        checked.add(model)
+
+        fields = self.get_index_fields(model, request, view)
+        if len(fields) < 2 or _has_index(model, fields):
+            return
+        warnings.warn(
+            f'{type(view).__name__} pages {model._meta.label} by {fields}, add '
+            f'models.Index(fields={fields!r}) to its Meta.indexes',
+            MissingIndexWarning,
+        )
+
+    def encode_cursor(self, cursor: Cursor) -> str:
+        tokens: dict[str, Any] = {}
+        if cursor.offset != 0:
+            tokens['o'] = str(cursor.offset)
+        if cursor.reverse:
+            tokens['r'] = '1'
+        if cursor.position is not None:
+            tokens['p'] = cursor.position
+        if self.parent_scope:
+            tokens['s'] = self.parent_scope
+
+        querystring = parse.urlencode(tokens, doseq=True)
+        encoded = b64encode(querystring.encode('ascii')).decode('ascii')
+        assert self.base_url is not None
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request: Request) -> Cursor | None:
+        cursor = super().decode_cursor(request)
+        if cursor is None:
+            return None
+
+        encoded = request.query_params[self.cursor_query_param]
+        tokens = parse.parse_qs(b64decode(encoded.encode('ascii')).decode('ascii'), keep_blank_values=True)
+        if tokens.get('s', [''])[0] != self.parent_scope:
+            # issued for other parents
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+
+def _has_index(model: type[Model], fields: list[str]) -> bool:
+    """
+    Whether an index of `model` starts with the columns of `fields`. Also
+    true when one of `fields` is not a model field, e.g. an annotation.
+    """
+    def columns(names: Any) -> list[str | None]:
+        result: list[str | None] = []
+        for name in names:
+            try:
+                result.append(model._meta.get_field(name.lstrip('-')).column)  # type: ignore[union-attr]
+            except FieldDoesNotExist:
+                result.append(None)
+        return result
+
+    wanted = columns(fields)
+    if None in wanted:
+        return True
+    candidates = [index.fields for index in model._meta.indexes]
+    candidates += [list(unique) for unique in model._meta.unique_together]
+    return any(columns(candidate)[:len(wanted)] == wanted for candidate in candidates)
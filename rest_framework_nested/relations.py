@@ -6,29 +6,72 @@ model relationships with hyperlinks.
 """
 from __future__ import annotations
 
-from functools import reduce
-from typing import Any, Generic, TypeVar
+from typing import Any, Callable, Generic, Sequence, TypeVar
 
-from django.core.exceptions import ObjectDoesNotExist
-from django.db.models import Model
-from rest_framework.relations import HyperlinkedRelatedField, ObjectTypeError, ObjectValueError
+from django.core.exceptions import FieldDoesNotExist, ObjectDoesNotExist, ValidationError as DjangoValidationError
+from django.db.models import Field, Model, QuerySet
+from rest_framework.relations import (
+    MANY_RELATION_KWARGS, HyperlinkedRelatedField, ManyRelatedField, ObjectTypeError, ObjectValueError,
+)
 from rest_framework.exceptions import ValidationError
 from rest_framework.request import Request
+from rest_framework.reverse import reverse
+
+from rest_framework_nested.instrumentation import incr, timed
+from rest_framework_nested.lookups import LOOKUP_SEP, aload_lookup_path, compile_lookup, get_lookup_value
+from rest_framework_nested.reverse import get_url_affixes, get_url_template, template_reverse
 
 
 T_Model = TypeVar('T_Model', bound=Model)
 
 
+class _DeferredLookup(Exception):
+    """
+    Raised by a field instead of querying, while `NestedManyRelatedField`
+    collects the lookups of every submitted item.
+    """
+    def __init__(self, lookup_kwargs: dict[str, Any], key: str) -> None:
+        self.filters = dict(lookup_kwargs)
+        self.key = key
+        self.value = self.filters.pop(key)
+        super().__init__(lookup_kwargs)
+
+
 class NestedHyperlinkedRelatedField(HyperlinkedRelatedField, Generic[T_Model]):
     lookup_field = 'pk'
     parent_lookup_kwargs = {
         'parent_pk': 'parent__pk'
     }
+    # Build URLs from a precompiled template instead of calling reverse()
+    # for every object. Falls back to reverse() when it does not apply.
+    use_url_template = False
 
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         self.parent_lookup_kwargs = kwargs.pop('parent_lookup_kwargs', self.parent_lookup_kwargs)
+        self.use_url_template = kwargs.pop('use_url_template', self.use_url_template)
+        self._defer_lookups = False
+        # model -> (URL kwarg, compiled lookup) of the parents, or None
+        self._parent_getters: dict[type[Any], tuple[tuple[str, Callable[[Any], Any]], ...] | None] = {}
         super().__init__(*args, **kwargs)
 
+    def bind(self, field_name: str, parent: Any) -> None:
+        super().bind(field_name, parent)
+        # compile the parent lookups for the model known up front
+        if self.source == '*':
+            model = getattr(getattr(parent, 'Meta', None), 'model', None)
+        else:
+            model = getattr(self.queryset, 'model', None)
+        if model is not None:
+            self._get_parent_getters(model)
+
+    @classmethod
+    def many_init(cls, *args: Any, **kwargs: Any) -> NestedManyRelatedField:
+        list_kwargs: dict[str, Any] = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return NestedManyRelatedField(**list_kwargs)
+
     def get_url(self, obj: Model, view_name: str, request: Request, format: str | None) -> str | None:
         """
         Given an object, return the URL that hyperlinks to the object.
@@ -44,23 +87,95 @@ class NestedHyperlinkedRelatedField(HyperlinkedRelatedField, Generic[T_Model]):
         lookup_value = getattr(obj, self.lookup_field)
         kwargs = {self.lookup_url_kwarg: lookup_value}
 
-        # multi-level lookup
-        for parent_lookup_kwarg in list(self.parent_lookup_kwargs.keys()):
-            underscored_lookup = self.parent_lookup_kwargs[parent_lookup_kwarg]
+        # multi-level lookup, e.g. obj.parent.pk read from obj.parent_id
+        try:
+            kwargs.update(self._get_parent_kwargs(obj))
+        except AttributeError:
+            # Not nested. Act like a standard HyperlinkedRelatedField
+            return super().get_url(obj, view_name, request, format)
+
+        return timed('reverse', self._reverse_url, view_name, kwargs, request, format)
 
-            # split each lookup by their __, e.g. "parent__pk" will be split into "parent" and "pk", or
-            # "parent__super__pk" would be split into "parent", "super" and "pk"
-            lookups = underscored_lookup.split('__')
+    def get_urls(self, objs: Sequence[Any]) -> list[Any] | None:
+        """
+        Return the representation of each of `objs`, as plain URL strings,
+        expanding one precompiled URL template with the scheme, host and
+        query params worked out once for all of them.
 
+        Returns `None` when the template can not be used, like for
+        `template_reverse()`. Objects that are not nested are represented
+        by `to_representation()`.
+        """
+        request = self.context.get('request')
+        format = self.context.get('format')
+        if format and self.format and self.format != format:
+            format = self.format
+        if format is not None or self.reverse is not reverse or getattr(request, 'versioning_scheme', None) is not None:
+            return None
+
+        assert self.view_name is not None
+        template = get_url_template(self.view_name, [self.lookup_url_kwarg, *self.parent_lookup_kwargs])
+        if template is None:
+            return None
+
+        prefix, suffix = get_url_affixes(request)
+        urls: list[Any] = []
+        for obj in objs:
+            if hasattr(obj, 'pk') and obj.pk in (None, ''):
+                urls.append(None)
+                continue
+            kwargs = {self.lookup_url_kwarg: getattr(obj, self.lookup_field)}
             try:
-                # use the Django ORM to lookup this value, e.g., obj.parent.pk
-                lookup_value = reduce(getattr, [obj] + lookups)  # type: ignore[operator,arg-type]
+                kwargs.update(self._get_parent_kwargs(obj))
             except AttributeError:
-                # Not nested. Act like a standard HyperlinkedRelatedField
-                return super().get_url(obj, view_name, request, format)
+                urls.append(self.to_representation(obj))
+                continue
+            path = template.expand(kwargs)
+            urls.append(self.to_representation(obj) if path is None else prefix + path + suffix)
+        incr('url_template', len(urls))
+        return urls
+
+    def _get_parent_kwargs(self, obj: Any) -> dict[str, Any]:
+        """
+        Returns the parent URL kwargs of `obj`, following the
+        `parent_lookup_kwargs` paths.
 
-            # store the lookup_name and value in kwargs, which is later passed to the reverse method
-            kwargs.update({parent_lookup_kwarg: lookup_value})
+        Raises `AttributeError` when a path can not be followed.
+        """
+        getters = self._get_parent_getters(obj.__class__)
+        if getters is None:
+            return {
+                url_kwarg: get_lookup_value(obj, lookup.split(LOOKUP_SEP))
+                for url_kwarg, lookup in self.parent_lookup_kwargs.items()
+            }
+        return {url_kwarg: get_value(obj) for url_kwarg, get_value in getters}
+
+    def _get_parent_getters(self, model: type[Any]) -> tuple[tuple[str, Callable[[Any], Any]], ...] | None:
+        """
+        Returns the `parent_lookup_kwargs` paths compiled for instances of
+        `model`, once per model. `None` when one of them can only be told
+        by following it on every object, e.g. an annotation.
+        """
+        try:
+            return self._parent_getters[model]
+        except KeyError:
+            pass
+        getters = []
+        for url_kwarg, lookup in self.parent_lookup_kwargs.items():
+            get_value = compile_lookup(model, lookup.split(LOOKUP_SEP)) if issubclass(model, Model) else None
+            if get_value is None:
+                self._parent_getters[model] = None
+                return None
+            getters.append((url_kwarg, get_value))
+        compiled = self._parent_getters[model] = tuple(getters)
+        return compiled
+
+    def _reverse_url(self, view_name: str, kwargs: dict[str, Any], request: Request, format: str | None) -> str:
+        if self.use_url_template and self.reverse is reverse:
+            url = template_reverse(view_name, kwargs, request=request, format=format)
+            if url is not None:
+                incr('url_template')
+                return url
 
         return self.reverse(view_name, kwargs=kwargs, request=request, format=format)
 
@@ -80,9 +195,15 @@ class NestedHyperlinkedRelatedField(HyperlinkedRelatedField, Generic[T_Model]):
             lookup_value = view_kwargs[parent_lookup_kwarg]
             kwargs.update({self.parent_lookup_kwargs[parent_lookup_kwarg]: lookup_value})
 
+        return self._get_by_lookup(kwargs, self.lookup_url_kwarg)
+
+    def _get_by_lookup(self, lookup_kwargs: dict[str, Any], key: str) -> T_Model:
+        if self._defer_lookups:
+            raise _DeferredLookup(lookup_kwargs, key)
+
         queryset = self.get_queryset()
         assert queryset is not None
-        return queryset.get(**kwargs)
+        return timed('get_object', queryset.get, **lookup_kwargs)
 
     def use_pk_only_optimization(self) -> bool:
         return False
@@ -96,9 +217,7 @@ class NestedHyperlinkedRelatedField(HyperlinkedRelatedField, Generic[T_Model]):
 
             # data is probable the lookup value, not the resource URL
             try:
-                queryset = self.get_queryset()
-                assert queryset is not None
-                return queryset.get(**{self.lookup_field: data})
+                return self._get_by_lookup({self.lookup_field: data}, self.lookup_field)
             except (ObjectDoesNotExist, ObjectValueError, ObjectTypeError):
                 self.fail('does_not_exist')
 
@@ -109,3 +228,124 @@ class NestedHyperlinkedIdentityField(NestedHyperlinkedRelatedField[T_Model]):
         kwargs['read_only'] = True
         kwargs['source'] = '*'
         super().__init__(view_name=view_name, **kwargs)
+
+
+class AsyncNestedHyperlinkedRelatedField(NestedHyperlinkedRelatedField[T_Model]):
+    """
+    A `NestedHyperlinkedRelatedField` for async serializers, like adrf's,
+    which await `aget_attribute()` and `ato_representation()` when a field
+    has them.
+
+    The related objects followed by `source` and `parent_lookup_kwargs` are
+    loaded with the async ORM first, so building the URL on the event loop
+    does not raise `SynchronousOnlyOperation`.
+    """
+    async def aget_attribute(self, instance: Any) -> Any:
+        await aload_lookup_path(instance, self.source_attrs)
+        return self.get_attribute(instance)
+
+    async def ato_representation(self, value: Any) -> Any:
+        await aload_lookup_path(value, [self.lookup_field])
+        for lookup in self.parent_lookup_kwargs.values():
+            await aload_lookup_path(value, lookup.split(LOOKUP_SEP))
+        return self.to_representation(value)
+
+
+class AsyncNestedHyperlinkedIdentityField(AsyncNestedHyperlinkedRelatedField[T_Model], NestedHyperlinkedIdentityField[T_Model]):
+    pass
+
+
+class NestedManyRelatedField(ManyRelatedField):
+    """
+    A `ManyRelatedField` that resolves every submitted hyperlink first, then
+    fetches the objects with one query per set of parent kwargs, instead of
+    one query per item.
+
+    Errors are the same, and reported for the same item, as when the items
+    are looked up one by one.
+    """
+    child_relation: NestedHyperlinkedRelatedField[Any]
+
+    def to_internal_value(self, data: Any) -> list[Any]:
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+
+        items = list(data)
+        child = self.child_relation
+        results: list[Any] = []
+        child._defer_lookups = True
+        try:
+            for item in items:
+                try:
+                    results.append(child.to_internal_value(item))
+                except (_DeferredLookup, ValidationError) as exc:
+                    results.append(exc)
+        finally:
+            child._defer_lookups = False
+
+        found = self._fetch([result for result in results if isinstance(result, _DeferredLookup)])
+        if found is None:
+            # can not be done in bulk, look them up one by one
+            return [child.to_internal_value(item) for item in items]
+
+        ret = []
+        for result in results:
+            if isinstance(result, ValidationError):
+                raise result
+            if isinstance(result, _DeferredLookup):
+                try:
+                    result = found[self._get_found_key(result)]
+                except KeyError:
+                    child.fail('does_not_exist')
+            ret.append(result)
+        return ret
+
+    def _get_model_field(self, queryset: QuerySet[Any], key: str) -> Field[Any, Any] | None:
+        try:
+            field = queryset.model._meta.pk if key == 'pk' else queryset.model._meta.get_field(key)
+        except FieldDoesNotExist:
+            return None
+        if not isinstance(field, Field) or field.is_relation:
+            return None
+        return field
+
+    def _get_found_key(self, lookup: _DeferredLookup) -> tuple[Any, ...]:
+        return (lookup.key, tuple(lookup.filters.items()), lookup.value)
+
+    def _fetch(self, lookups: list[_DeferredLookup]) -> dict[tuple[Any, ...], Any] | None:
+        """
+        Fetch the objects of `lookups`, grouped by their parent filters.
+        Returns `None` if they can not be fetched in bulk.
+        """
+        if not lookups:
+            return {}
+
+        queryset = self.child_relation.get_queryset()
+        assert queryset is not None
+
+        groups: dict[tuple[str, tuple[tuple[str, Any], ...]], list[Any]] = {}
+        for lookup in lookups:
+            field = self._get_model_field(queryset, lookup.key)
+            if field is None:
+                return None
+            try:
+                lookup.value = field.to_python(lookup.value)
+            except (DjangoValidationError, TypeError):
+                return None
+            groups.setdefault((lookup.key, tuple(lookup.filters.items())), []).append(lookup.value)
+
+        found: dict[tuple[Any, ...], Any] = {}
+        for (key, filters), values in groups.items():
+            try:
+                objects: list[Any] = timed('get_object', list, queryset.filter(**dict(filters), **{f'{key}__in': values}))
+            except (ValueError, TypeError):
+                return None
+            for obj in objects:
+                found_key = (key, filters, getattr(obj, key))
+                if found_key in found:
+                    # more than one match, the error comes from `.get()`
+                    return None
+                found[found_key] = obj
+        return found
@@ -28,13 +28,69 @@ Example:
 from __future__ import annotations
 
 import sys
+import inspect
+import json
 import re
-from typing import Any
+from typing import Any, NamedTuple
 
-from rest_framework.routers import DefaultRouter, SimpleRouter
+from rest_framework.routers import BaseRouter, DefaultRouter, Route, SimpleRouter
 
 IDENTIFIER_REGEX = re.compile(r"^[^\d\W]\w*$", re.UNICODE)
 
+# path() converter routes, SimpleRouter(use_regex_path=...), need DRF 3.15
+SUPPORTS_USE_REGEX_PATH = 'use_regex_path' in inspect.signature(SimpleRouter.__init__).parameters
+
+# Added to the list route, only bound for viewsets having the actions,
+# like those using `mixins.BulkWriteMixin`.
+BULK_LIST_MAPPING = {
+    'put': 'bulk_update',
+    'patch': 'partial_bulk_update',
+    'delete': 'bulk_destroy',
+}
+
+
+class RouteEntry(NamedTuple):
+    """
+    A route of a nested router, as listed by `NestedMixin.get_route_table()`.
+    """
+    # the URL name, e.g. 'domain-nameservers-detail'
+    name: str
+    basename: str
+    prefix: str
+    # URL prefixes of the parents, outermost first
+    parent_prefixes: tuple[str, ...]
+    # URL kwargs of the parent lookups, outermost first
+    parent_lookup_kwargs: tuple[str, ...]
+    # URL kwarg of the instance lookup, None for list routes
+    lookup_kwarg: str | None
+    detail: bool
+    # number of parents
+    depth: int
+    # the regex, or path() route, of the URL pattern
+    pattern: str
+    # (HTTP method, action) pairs bound by the route
+    mapping: tuple[tuple[str, str], ...]
+
+
+def get_registry_index(router: BaseRouter | NestedMixin) -> dict[str, tuple[str, Any, str]]:
+    """
+    Returns a `prefix -> (prefix, viewset, basename)` index of the router's
+    registry, keeping the first entry of each prefix.
+
+    The index is kept on the router and updated as viewsets get registered,
+    so every router nested under it shares the same lookups.
+    """
+    registry = router.registry  # type: ignore[union-attr]
+    index: dict[str, tuple[str, Any, str]]
+    index, indexed = getattr(router, '_registry_index', ({}, 0))
+    if indexed > len(registry):
+        # entries were removed, start over
+        index, indexed = {}, 0
+    for entry in registry[indexed:]:
+        index.setdefault(entry[0], entry)
+    router._registry_index = (index, len(registry))  # type: ignore[union-attr]
+    return index
+
 
 class LookupMixin:
     """
@@ -56,6 +112,10 @@ class NestedMixin:
         self.parent_prefix = parent_prefix
         self.nest_count = getattr(parent_router, 'nest_count', 0) + 1
         self.nest_prefix = kwargs.pop('lookup', f'nested_{self.nest_count}') + '_'
+        if 'use_regex_path' not in kwargs and (SUPPORTS_USE_REGEX_PATH or hasattr(parent_router, '_use_regex')):
+            # Inherit use_regex_path only when not specified explicitly, so
+            # the whole chain is either regex or path() converter based.
+            kwargs['use_regex_path'] = getattr(parent_router, '_use_regex', True)
         self.use_regex_path = kwargs.get('use_regex_path', True)
 
         super().__init__(*args, **kwargs)
@@ -76,53 +136,136 @@ class NestedMixin:
             # we set our trailing slash to just '/', leading to inconsistent behavior.
             self.trailing_slash = parent_router.trailing_slash  # type: ignore[has-type]
 
-        parent_registry = [
-            registered for registered
-            in self.parent_router.registry  # type: ignore[union-attr]
-            if registered[0] == self.parent_prefix
-        ]
         try:
-            parent_registry_item = parent_registry[0]
-            parent_prefix, parent_viewset, parent_basename = parent_registry_item
-        except:
+            parent_prefix, parent_viewset, parent_basename = get_registry_index(parent_router)[self.parent_prefix]
+        except KeyError:
             raise RuntimeError('parent registered resource not found')
 
         self.check_valid_name(self.nest_prefix)
 
-        nested_routes = []
-        parent_lookup_regex = parent_router.get_lookup_regex(parent_viewset, self.nest_prefix)  # type: ignore[union-attr]
-
-        self.parent_regex = f'{parent_prefix}/{parent_lookup_regex}/'
-        # If there is no parent prefix, the first part of the url is probably
-        #   controlled by the project's urls.py and the router is in an app,
-        #   so a slash in the beginning will (A) cause Django to give warnings
-        #   and (B) generate URLs that will require using `//`
-        if not self.parent_prefix and self.parent_regex[0] == '/':
-            self.parent_regex = self.parent_regex[1:]
-        if hasattr(parent_router, 'parent_regex'):
-            self.parent_regex = parent_router.parent_regex + self.parent_regex
-
-        for route in self.routes:  # type: ignore[has-type]
-            route_contents = route._asdict()
-
-            # This will get passed through .format in a little bit, so we need
-            # to escape it
-            escaped_parent_regex = self.parent_regex.replace('{', '{{').replace('}', '}}')
-
-            if self.use_regex_path:
-                route_contents['url'] = route.url.replace('^', '^' + escaped_parent_regex)
-            else:
-                route_contents['url'] = escaped_parent_regex + route_contents['url']
-
-            nested_routes.append(type(route)(**route_contents))
-
-        self.routes = nested_routes
+        # (router, prefix, viewset, lookup prefix) of every parent, outermost first
+        self.parent_chain: tuple[tuple[Any, str, Any, str], ...] = getattr(parent_router, 'parent_chain', ()) + (
+            (parent_router, parent_prefix, parent_viewset, self.nest_prefix),
+        )
+
+        parent_regex = ''
+        for router, prefix, viewset, lookup_prefix in self.parent_chain:
+            # In path() mode every level is rebuilt here, so no regex left
+            # over from a parent ends up in the converter based urls.
+            lookup_router = router if self.use_regex_path and getattr(router, '_use_regex', True) else self
+            lookup_regex = lookup_router.get_lookup_regex(viewset, lookup_prefix)
+            level_regex = f'{prefix}/{lookup_regex}/'
+            # If there is no parent prefix, the first part of the url is probably
+            #   controlled by the project's urls.py and the router is in an app,
+            #   so a slash in the beginning will (A) cause Django to give warnings
+            #   and (B) generate URLs that will require using `//`
+            if not prefix and level_regex[0] == '/':
+                level_regex = level_regex[1:]
+            parent_regex += level_regex
+        self.parent_regex = parent_regex
+
+    def get_routes(self, viewset: Any) -> list[Route]:
+        """
+        The routes of `viewset`, nested under `parent_regex`.
+
+        Nested here rather than in `__init__()`, so that constructing many
+        nested routers stays cheap, and `routes` keeps the routes declared
+        by the router class.
+        """
+        return [self._nest_route(route) for route in super().get_routes(viewset)]  # type: ignore[misc]
+
+    def _nest_route(self, route: Route) -> Route:
+        route_contents = route._asdict()
+        # not mapping.get(), the mapping of an @action is a MethodMapper
+        if 'get' in route.mapping and route.mapping['get'] == 'list':
+            route_contents['mapping'] = {**BULK_LIST_MAPPING, **route.mapping}
+
+        # This will get passed through .format in a little bit, so we need
+        # to escape it
+        escaped_parent_regex = self.parent_regex.replace('{', '{{').replace('}', '}}')
+
+        if not self.use_regex_path:
+            route_contents['url'] = escaped_parent_regex + route.url
+        elif route.url.startswith('^'):
+            # only the leading anchor, url_path regexes may contain others
+            route_contents['url'] = '^' + escaped_parent_regex + route.url[1:]
+
+        return type(route)(**route_contents)
+
+    def get_route_table(self) -> tuple[RouteEntry, ...]:
+        """
+        Returns the routes of the registered viewsets, with their parent
+        prefixes and lookup URL kwargs, in URL pattern order.
+
+        The table is built once and kept until viewsets get registered.
+        """
+        registry = self.registry  # type: ignore[attr-defined]
+        table, registered = getattr(self, '_route_table', ((), -1))
+        if registered != len(registry):
+            table = self._build_route_table()
+            self._route_table = (table, len(registry))
+        return table
+
+    def dump_route_table(self, **kwargs: Any) -> str:
+        """
+        Returns the route table as a JSON list of objects, e.g. for tools
+        loading the routes at startup. `kwargs` are passed to `json.dumps`.
+        """
+        return json.dumps([
+            {**entry._asdict(), 'mapping': dict(entry.mapping)}
+            for entry in self.get_route_table()
+        ], **kwargs)
+
+    def _build_route_table(self) -> tuple[RouteEntry, ...]:
+        parent_prefixes = tuple(prefix for _router, prefix, _viewset, _lookup_prefix in self.parent_chain)
+        parent_lookup_kwargs = tuple(
+            lookup_prefix + _get_lookup_url_kwarg(viewset)
+            for _router, _prefix, viewset, lookup_prefix in self.parent_chain
+        )
+
+        table = []
+        for prefix, viewset, basename in self.registry:  # type: ignore[attr-defined]
+            lookup = self.get_lookup_regex(viewset)
+            for route in self.get_routes(viewset):
+                mapping = self.get_method_map(viewset, route.mapping)  # type: ignore[attr-defined]
+                if not mapping:
+                    continue
+                table.append(RouteEntry(
+                    name=route.name.format(basename=basename),
+                    basename=basename,
+                    prefix=prefix,
+                    parent_prefixes=parent_prefixes,
+                    parent_lookup_kwargs=parent_lookup_kwargs,
+                    lookup_kwarg=_get_lookup_url_kwarg(viewset) if '{lookup}' in route.url else None,
+                    detail=route.detail,
+                    depth=self.nest_count,
+                    pattern=route.url.format(prefix=prefix, lookup=lookup, trailing_slash=self.trailing_slash),
+                    mapping=tuple(mapping.items()),
+                ))
+        return tuple(table)
+
+    def get_lookup_regex(self, viewset: Any, lookup_prefix: str = '') -> str:
+        """
+        In path() mode, only use `lookup_value_converter` (default 'str'),
+        never the `lookup_value_regex` fallback of SimpleRouter.
+        """
+        if self.use_regex_path:
+            return super().get_lookup_regex(viewset, lookup_prefix)  # type: ignore[misc]
+        lookup_field = getattr(viewset, 'lookup_field', 'pk')
+        lookup_url_kwarg = getattr(viewset, 'lookup_url_kwarg', None) or lookup_field
+        lookup_value = getattr(viewset, 'lookup_value_converter', None) or 'str'
+        return f'<{lookup_value}:{lookup_prefix}{lookup_url_kwarg}>'
 
     def check_valid_name(self, value: str) -> None:
         if IDENTIFIER_REGEX.match(value) is None:
             raise ValueError(f"lookup argument '{value}' needs to be valid python identifier")
 
 
+def _get_lookup_url_kwarg(viewset: Any) -> str:
+    lookup_field: str = getattr(viewset, 'lookup_field', 'pk')
+    return getattr(viewset, 'lookup_url_kwarg', None) or lookup_field
+
+
 class NestedSimpleRouter(NestedMixin, SimpleRouter):  # type: ignore[misc]
     """ Create a NestedSimpleRouter nested within `parent_router`
     Args:
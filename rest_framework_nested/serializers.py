@@ -1,11 +1,22 @@
 from __future__ import annotations
 
-from typing import Any, TypeVar
+import copy
+from functools import lru_cache
+from typing import Any, NamedTuple, TypeVar
+from weakref import WeakKeyDictionary
 
 import rest_framework.serializers
-from django.db.models import Model
-from rest_framework.fields import Field
+from django.core.exceptions import FieldDoesNotExist, FieldError
+from django.db.models import ForeignKey, Model, QuerySet
+from django.db.models.manager import BaseManager
+from django.db.models.query import ModelIterable
+from django.db.models.query_utils import DeferredAttribute
+from django.urls import NoReverseMatch
+from rest_framework.fields import Field, SkipField
+from rest_framework.relations import Hyperlink, ManyRelatedField, PKOnlyObject, PrimaryKeyRelatedField
+from rest_framework.serializers import BaseSerializer, ListSerializer, ModelSerializer, Serializer
 from rest_framework.utils.model_meta import RelationInfo
+from rest_framework_nested.lookups import LOOKUP_SEP, follow_relations, get_related_path, get_relation
 from rest_framework_nested.relations import NestedHyperlinkedIdentityField, NestedHyperlinkedRelatedField
 try:
     from rest_framework.utils.field_mapping import get_nested_relation_kwargs
@@ -17,6 +28,250 @@ except ImportError:
 
 T_Model = TypeVar('T_Model', bound=Model)
 
+# serializer class -> parent_lookup_kwargs items -> unbound fields
+_field_prototypes: WeakKeyDictionary[type[Any], dict[frozenset[tuple[str, str]], dict[str, Field]]] = WeakKeyDictionary()
+
+
+class RelatedLookups(NamedTuple):
+    select_related: tuple[str, ...]
+    prefetch_related: tuple[str, ...]
+
+    def apply(self, queryset: QuerySet[T_Model]) -> QuerySet[T_Model]:
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        return queryset
+
+
+def get_related_lookups(serializer: BaseSerializer[Any]) -> RelatedLookups:
+    """
+    Plan the `select_related` and `prefetch_related` lookups needed to follow
+    every `parent_lookup_kwargs` of `serializer` and its nested serializers,
+    so building the hyperlinks does not issue a query per row and level.
+    """
+    if isinstance(serializer, ListSerializer):
+        serializer = serializer.child  # type: ignore[assignment]
+
+    select: dict[str, None] = {}
+    prefetch: dict[str, None] = {}
+    model = getattr(getattr(serializer, 'Meta', None), 'model', None)
+    if isinstance(serializer, ModelSerializer) and model is not None:
+        _collect_related_lookups(serializer, model, [], select, prefetch)
+    return RelatedLookups(tuple(select), tuple(prefetch))
+
+
+def _collect_related_lookups(
+    serializer: ModelSerializer[Any],
+    model: type[Model],
+    prefix: list[str],
+    select: dict[str, None],
+    prefetch: dict[str, None],
+) -> None:
+    def add(relations: list[str], many: bool) -> None:
+        if relations:
+            (prefetch if many else select)[LOOKUP_SEP.join(relations)] = None
+
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+
+        child: Field[Any, Any, Any, Any] = field
+        if isinstance(field, ListSerializer):
+            child = field.child  # type: ignore[assignment]
+        elif isinstance(field, ManyRelatedField):
+            child = field.child_relation
+
+        source = prefix + list(field.source_attrs)
+        if not isinstance(child, (NestedHyperlinkedRelatedField, ModelSerializer)):
+            continue
+
+        if source != prefix:
+            # the related instance itself is loaded to be represented
+            followed = follow_relations(model, source)
+            if followed is None:
+                continue
+            add(source, followed[1])
+
+        if isinstance(child, NestedHyperlinkedRelatedField):
+            for lookup in child.parent_lookup_kwargs.values():
+                related_path = get_related_path(model, source + lookup.split(LOOKUP_SEP))
+                if related_path is not None:
+                    add(*related_path)
+        else:
+            _collect_related_lookups(child, model, source, select, prefetch)
+
+
+class _ValuesPlan(NamedTuple):
+    # the values_list() columns
+    columns: tuple[str, ...]
+    # (field name, function of a row returning the representation)
+    renderers: tuple[tuple[str, Any], ...]
+
+
+class NestedHyperlinkedListSerializer(ListSerializer[Any]):
+    """
+    A `ListSerializer` rendering the `NestedHyperlinkedIdentityField` of all
+    the rows in one pass, expanding a URL template precompiled for the list
+    instead of reversing the URL of every row:
+
+        class Meta:
+            list_serializer_class = NestedHyperlinkedListSerializer
+
+    The URLs are the same, as plain strings: their `name` is not available
+    for the browsable API. Lists the template does not apply to, see
+    `NestedHyperlinkedRelatedField.get_urls()`, are rendered as usual.
+    """
+    def to_representation(self, data: Any) -> list[Any]:
+        child = self.child
+        if not isinstance(child, Serializer) or type(child).to_representation is not Serializer.to_representation:
+            return super().to_representation(data)
+
+        iterable = data.all() if isinstance(data, BaseManager) else data
+        instances = list(iterable)
+        fields = list(child._readable_fields)
+        links: dict[str, list[Any]] = {}
+        for field in fields:
+            if isinstance(field, NestedHyperlinkedIdentityField) and type(field).get_url is NestedHyperlinkedRelatedField.get_url:
+                urls = field.get_urls(instances)
+                if urls is not None:
+                    links[field.field_name] = urls  # type: ignore[index]
+        if not links:
+            return super().to_representation(instances)
+
+        result = []
+        for index, instance in enumerate(instances):
+            ret: dict[Any, Any] = {}
+            for field in fields:
+                if field.field_name in links:
+                    ret[field.field_name] = links[field.field_name][index]
+                    continue
+                try:
+                    attribute = field.get_attribute(instance)
+                except SkipField:
+                    continue
+                check_for_none = attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+                ret[field.field_name] = None if check_for_none is None else field.to_representation(attribute)
+            result.append(ret)
+        return result
+
+
+class NestedValuesListSerializer(NestedHyperlinkedListSerializer):
+    """
+    A `ListSerializer` rendering querysets from `values_list()` rows instead
+    of model instances, for read-only nested lists:
+
+        class Meta:
+            list_serializer_class = NestedValuesListSerializer
+
+    Only plain model fields, primary key relations and nested hyperlinks can
+    be read from the rows, not fields wrapping their value on the instance,
+    like `FileField`. Serializers with any other readable field, and
+    data that is not an unevaluated queryset of model instances, are
+    rendered like `NestedHyperlinkedListSerializer` does. Hyperlinks render the same URLs, but their `name` is
+    not available for the browsable API.
+    """
+    def to_representation(self, data: Any) -> list[Any]:
+        queryset = data.all() if isinstance(data, BaseManager) else data
+        # only querysets of model instances that are not loaded yet
+        if isinstance(queryset, QuerySet) and queryset._result_cache is None and queryset._iterable_class is ModelIterable:
+            plan = self._get_values_plan(queryset.model)
+            if plan is not None:
+                try:
+                    rows = queryset.prefetch_related(None).values_list(*plan.columns)
+                    return [
+                        {name: render(row) for name, render in plan.renderers}
+                        for row in rows
+                    ]
+                except (FieldError, NoReverseMatch):
+                    # the regular rendering fails the same way, with the
+                    # error messages of the fields
+                    pass
+        return super().to_representation(data)
+
+    def _get_values_plan(self, model: type[Model]) -> _ValuesPlan | None:
+        try:
+            return self.__dict__['_values_plan']
+        except KeyError:
+            plan = self.__dict__['_values_plan'] = self._build_values_plan(model)
+            return plan
+
+    def _build_values_plan(self, model: type[Model]) -> _ValuesPlan | None:
+        columns: dict[str, int] = {}
+
+        def column(path: str) -> int:
+            return columns.setdefault(path, len(columns))
+
+        renderers = []
+        for field in self.child._readable_fields:  # type: ignore[union-attr]
+            source_attrs = list(field.source_attrs)
+            if type(field) in (NestedHyperlinkedRelatedField, NestedHyperlinkedIdentityField):
+                if source_attrs and not isinstance(get_relation(model, source_attrs[0]), ForeignKey):
+                    return None
+                if len(source_attrs) > 1:
+                    return None
+                renderer = self._hyperlink_renderer(field, source_attrs, column)
+            elif len(source_attrs) != 1:
+                return None
+            elif type(field) is PrimaryKeyRelatedField:
+                relation = get_relation(model, source_attrs[0])
+                if not isinstance(relation, ForeignKey):
+                    return None
+                renderer = self._value_renderer(field, column(relation.attname), PKOnlyObject)
+            elif type(field).get_attribute is not Field.get_attribute:
+                return None
+            else:
+                try:
+                    model_field = model._meta.get_field(source_attrs[0])
+                except FieldDoesNotExist:
+                    return None
+                if not model_field.concrete or model_field.is_relation:
+                    return None
+                # e.g. `FieldFile` of file fields, not returned by `values_list()`
+                if type(getattr(model, model_field.attname)) is not DeferredAttribute:
+                    return None
+                renderer = self._value_renderer(field, column(source_attrs[0]), None)
+            renderers.append((field.field_name, renderer))
+
+        return _ValuesPlan(tuple(columns), tuple(renderers))
+
+    @staticmethod
+    def _value_renderer(field: Field, index: int, wrap: Any) -> Any:
+        to_representation = field.to_representation
+
+        def render(row: tuple[Any, ...]) -> Any:
+            value = row[index]
+            if value is None:
+                return None
+            return to_representation(wrap(pk=value) if wrap else value)
+        return render
+
+    @staticmethod
+    def _hyperlink_renderer(field: NestedHyperlinkedRelatedField[Any], source_attrs: list[str], column: Any) -> Any:
+        prefix = ''.join(f'{attr}{LOOKUP_SEP}' for attr in source_attrs)
+        lookup_index = column(prefix + field.lookup_field)
+        parent_indexes = [
+            (url_kwarg, column(prefix + lookup))
+            for url_kwarg, lookup in field.parent_lookup_kwargs.items()
+        ]
+        view_name = field.view_name
+        assert view_name is not None
+        lookup_url_kwarg = field.lookup_url_kwarg
+
+        def render(row: tuple[Any, ...]) -> Any:
+            lookup_value = row[lookup_index]
+            if lookup_value is None:
+                return None
+            request = field.context['request']
+            format = field.context.get('format')
+            if format and field.format and field.format != format:
+                format = field.format
+            kwargs = {lookup_url_kwarg: lookup_value}
+            for url_kwarg, index in parent_indexes:
+                kwargs[url_kwarg] = row[index]
+            return Hyperlink(field._reverse_url(view_name, kwargs, request, format), None)
+        return render
+
 
 class NestedHyperlinkedModelSerializer(rest_framework.serializers.HyperlinkedModelSerializer[T_Model]):
     """
@@ -35,10 +290,34 @@ class NestedHyperlinkedModelSerializer(rest_framework.serializers.HyperlinkedMod
     serializer_url_field = NestedHyperlinkedIdentityField
     serializer_related_field = NestedHyperlinkedRelatedField
 
+    # Build the fields once per class and `parent_lookup_kwargs`, and give
+    # every instance copies of them. Only for serializers whose fields do
+    # not depend on the instance, e.g. on the context.
+    cache_fields = False
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         self.parent_lookup_kwargs = kwargs.pop('parent_lookup_kwargs', self.parent_lookup_kwargs)
         super().__init__(*args, **kwargs)
 
+    def get_fields(self) -> dict[str, Field]:
+        if not self.cache_fields:
+            return super().get_fields()
+
+        prototypes = _field_prototypes.setdefault(type(self), {})
+        key = frozenset(self.parent_lookup_kwargs.items())
+        try:
+            fields = prototypes[key]
+        except KeyError:
+            fields = prototypes[key] = super().get_fields()
+        return copy.deepcopy(fields)
+
+    def get_related_lookups(self) -> RelatedLookups:
+        """
+        Return the `select_related`/`prefetch_related` lookups that avoid
+        one query per row when following `parent_lookup_kwargs`.
+        """
+        return get_related_lookups(self)
+
     def build_url_field(self, field_name: str, model_class: type[T_Model]) -> tuple[type[Field], dict[str, Any]]:
         field_class, field_kwargs = super().build_url_field(
             field_name,
@@ -54,13 +333,32 @@ class NestedHyperlinkedModelSerializer(rest_framework.serializers.HyperlinkedMod
         """
         Create nested fields for forward and reverse relationships.
         """
-        class NestedSerializer(NestedHyperlinkedModelSerializer):
-            class Meta:
-                model = relation_info.related_model
-                depth = nested_depth - 1
-                fields = '__all__'
-
-        field_class = NestedSerializer
+        field_class = get_nested_serializer_class(
+            relation_info.related_model,
+            nested_depth - 1,
+            tuple(NestedHyperlinkedModelSerializer.parent_lookup_kwargs.items()),
+        )
         field_kwargs = get_nested_relation_kwargs(relation_info)
 
         return field_class, field_kwargs
+
+
+@lru_cache(maxsize=512)
+def get_nested_serializer_class(
+    related_model: type[Model], nested_depth: int, parent_lookup_kwargs: tuple[tuple[str, str], ...]
+) -> type[NestedHyperlinkedModelSerializer[Any]]:
+    """
+    Returns the serializer class of a nested relation, for `depth > 0`,
+    `nested_depth` levels deep.
+
+    Generated once per arguments, so every instantiation of a serializer
+    reuses the same classes.
+    """
+    class NestedSerializer(NestedHyperlinkedModelSerializer[Any]):
+        class Meta:
+            model = related_model
+            depth = nested_depth
+            fields = '__all__'
+
+    NestedSerializer.parent_lookup_kwargs = dict(parent_lookup_kwargs)
+    return NestedSerializer
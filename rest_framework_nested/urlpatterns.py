@@ -0,0 +1,221 @@
+"""
+Prefix tree of the URL patterns generated by the nested routers.
+
+Routers produce a flat list of `re_path`s, each repeating the whole
+`parent_regex`, which Django tries one by one. `trie_patterns` groups them
+into nested resolvers keyed on their leading path segments, so resolving a
+path only tries the patterns under its own branch:
+
+    urlpatterns = trie_patterns(router.urls + domains_router.urls)
+"""
+from __future__ import annotations
+
+import re
+from typing import NamedTuple, Sequence
+
+from django.urls import URLPattern, URLResolver, include, re_path
+from django.urls.resolvers import RegexPattern
+
+QUANTIFIERS = '?*+{'
+_LITERAL_TOKEN = re.compile(r'[A-Za-z0-9_\-~]|\\[.\-/~_]')
+
+
+def _group_end(regex: str) -> int | None:
+    """
+    Returns the index just after the group opening at `regex[0]`.
+    """
+    depth = 0
+    in_class = False
+    i = 0
+    while i < len(regex):
+        char = regex[i]
+        if char == '\\':
+            i += 2
+            continue
+        if in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+            # a ']' right after '[' or '[^' is a literal
+            if regex[i + 1:i + 2] == '^':
+                i += 1
+            if regex[i + 1:i + 2] == ']':
+                i += 1
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return None
+
+
+def _is_splittable(regex: str) -> bool:
+    """
+    Whether `regex` has balanced groups and classes, and no `|` outside of
+    groups, which would apply to the segments split off it.
+    """
+    depth = 0
+    in_class = False
+    i = 0
+    while i < len(regex):
+        char = regex[i]
+        if char == '\\':
+            i += 2
+            continue
+        if in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+            # a ']' right after '[' or '[^' is a literal
+            if regex[i + 1:i + 2] == '^':
+                i += 1
+            if regex[i + 1:i + 2] == ']':
+                i += 1
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+            if depth < 0:
+                return False
+        elif char == '|' and depth == 0:
+            return False
+        i += 1
+    return depth == 0 and not in_class
+
+
+def _literal_prefix(regex: str) -> str:
+    """
+    Returns the text every path matched by `regex` starts with.
+    """
+    literal = []
+    i = 0
+    while i < len(regex):
+        match = _LITERAL_TOKEN.match(regex, i) if regex[i] != '/' else None
+        token = '/' if regex[i] == '/' else (match.group()[-1] if match else None)
+        if token is None:
+            break
+        i = match.end() if match else i + 1
+        if regex[i:i + 1] and regex[i] in QUANTIFIERS:
+            # the last character is optional or repeated
+            break
+        literal.append(token)
+    return ''.join(literal)
+
+
+def _split_segment(regex: str) -> tuple[str, str] | None:
+    """
+    Splits the leading path segment, ending with '/', off `regex`. Only
+    plain literals and single named groups are split.
+    """
+    if regex.startswith('(?P<'):
+        end = _group_end(regex)
+    else:
+        end = 0
+        while (match := _LITERAL_TOKEN.match(regex, end)) is not None:
+            end = match.end()
+        if not end:
+            return None
+
+    if end is None or regex[end:end + 1] != '/' or regex[end + 1:end + 2] in tuple(QUANTIFIERS):
+        return None
+    return regex[:end + 1], regex[end + 1:]
+
+
+class _Entry(NamedTuple):
+    pattern: URLPattern | URLResolver
+    # remaining leading segments, and the rest of the regex after them
+    segments: tuple[str, ...]
+    remainder: str | None
+    depth: int
+
+    @property
+    def key(self) -> str | None:
+        return self.segments[0] if self.segments else None
+
+    @property
+    def literal(self) -> str:
+        if self.remainder is None:
+            return ''
+        return _literal_prefix(''.join(self.segments) + self.remainder)
+
+    def shift(self) -> _Entry:
+        return self._replace(segments=self.segments[1:], depth=self.depth + 1)
+
+    def as_pattern(self) -> URLPattern | URLResolver:
+        if not self.depth:
+            return self.pattern
+        assert isinstance(self.pattern, URLPattern) and self.remainder is not None
+        return re_path(
+            '^' + ''.join(self.segments) + self.remainder,
+            self.pattern.callback,
+            self.pattern.default_args,
+            self.pattern.name,
+        )
+
+
+def _make_entry(pattern: URLPattern | URLResolver) -> _Entry:
+    regex = pattern.pattern.regex.pattern if isinstance(pattern.pattern, RegexPattern) else ''
+    if not isinstance(pattern, URLPattern) or not regex.startswith('^') or '(?P=' in regex or not _is_splittable(regex):
+        # left as is, and never grouped
+        return _Entry(pattern, (), None, 0)
+
+    segments = []
+    remainder = regex[1:]
+    while (split := _split_segment(remainder)) is not None:
+        segment, remainder = split
+        segments.append(segment)
+    return _Entry(pattern, tuple(segments), remainder, 0)
+
+
+def _disjoint(literal: str, other: str) -> bool:
+    """
+    Whether no path can start with both `literal` and `other`.
+    """
+    return not (literal.startswith(other) or other.startswith(literal))
+
+
+def _build(entries: Sequence[_Entry]) -> list[URLPattern | URLResolver]:
+    # (key, literal prefix, entries) in the original order
+    groups: list[tuple[str | None, str, list[_Entry]]] = []
+    for entry in entries:
+        key = entry.key
+        if key is not None:
+            # Join the last group with the same key, unless a pattern in
+            # between could match the same paths and so must be tried first.
+            literal = entry.literal
+            for group_key, group_literal, group_entries in reversed(groups):
+                if group_key == key:
+                    group_entries.append(entry)
+                    break
+                if not _disjoint(group_literal, literal):
+                    groups.append((key, _literal_prefix(key), [entry]))
+                    break
+            else:
+                groups.append((key, _literal_prefix(key), [entry]))
+        else:
+            groups.append((None, entry.literal, [entry]))
+
+    ret: list[URLPattern | URLResolver] = []
+    for key, _, group_entries in groups:
+        if key is None or len(group_entries) == 1:
+            ret.extend(entry.as_pattern() for entry in group_entries)
+        else:
+            children = _build([entry.shift() for entry in group_entries])
+            ret.append(re_path('^' + key, include(children)))
+    return ret
+
+
+def trie_patterns(urlpatterns: Sequence[URLPattern | URLResolver]) -> list[URLPattern | URLResolver]:
+    """
+    Returns `urlpatterns` grouped into nested resolvers by their leading
+    path segments, like `domains/` or `(?P<domain_pk>[^/.]+)/`.
+
+    Paths resolve to the same view, kwargs and url name as with the flat
+    list, and the url names reverse the same way. Patterns are only grouped
+    when no pattern in between could match the same paths, so the first
+    matching pattern still wins. Anything other than a regex `URLPattern`
+    (includes, `path()` routes) is kept as is.
+    """
+    return _build([_make_entry(pattern) for pattern in urlpatterns])
@@ -1,16 +1,55 @@
 from __future__ import annotations
 
 import contextlib
-from typing import Any, Generic, Iterator, TypeVar
+from inspect import iscoroutinefunction
+from typing import TYPE_CHECKING, Any, Generic, Iterator, Mapping, NamedTuple, TypeVar
+from weakref import WeakKeyDictionary
 
-from django.core.exceptions import ImproperlyConfigured
-from django.db.models import Model, QuerySet
+from django.core.exceptions import ImproperlyConfigured, ValidationError as DjangoValidationError
+from django.db.models import Exists, Field, Model, QuerySet
 from django.http import HttpRequest, QueryDict
+from rest_framework.exceptions import NotFound
 from rest_framework.request import Request
 from rest_framework.serializers import BaseSerializer
 
+from rest_framework_nested.instrumentation import timed, timer
+from rest_framework_nested.lookups import LOOKUP_SEP, get_lookup_field, get_relation
+
+if TYPE_CHECKING:
+    from rest_framework_nested.serializers import RelatedLookups
+
 T_Model = TypeVar('T_Model', bound=Model)
 
+_related_lookups: WeakKeyDictionary[type[BaseSerializer[Any]], RelatedLookups] = WeakKeyDictionary()
+
+
+class ParentLookup(NamedTuple):
+    # the URL kwarg, e.g. 'parent_pk'
+    url_kwarg: str
+    # the ORM path it filters on, e.g. 'parent__root__pk'
+    orm_path: str
+    # the first segment of the path, e.g. 'parent'
+    parent_arg: str
+    # the rest of the path, filtered on the parent, e.g. 'root__pk'
+    parent_filter: str
+    # the model field converting the URL value, if the path ends on one
+    field: Field[Any, Any] | None
+
+
+def build_parent_lookup_plan(model: type[Model] | None, parent_lookup_kwargs: Mapping[str, str]) -> tuple[ParentLookup, ...]:
+    """
+    Resolves `parent_lookup_kwargs` against `model` into `ParentLookup`s.
+    """
+    plan = []
+    for url_kwarg, orm_path in parent_lookup_kwargs.items():
+        parent_arg, _, parent_filter = orm_path.partition(LOOKUP_SEP)
+        field = get_lookup_field(model, orm_path) if model is not None else None
+        plan.append(ParentLookup(url_kwarg, orm_path, parent_arg, parent_filter or 'pk', field))
+    return tuple(plan)
+
+
+_parent_lookup_plans: WeakKeyDictionary[type[Any], dict[type[Model] | None, tuple[ParentLookup, ...]]] = WeakKeyDictionary()
+
 
 @contextlib.contextmanager
 def _force_mutable(querydict: QueryDict | dict[str, Any] | list[Any]) -> Iterator[QueryDict | dict[str, Any] | list[Any]]:
@@ -26,7 +65,99 @@ def _force_mutable(querydict: QueryDict | dict[str, Any] | list[Any]) -> Iterato
         querydict._mutable = initial_mutability  # type: ignore[union-attr]
 
 
+class ParentLookupOverlay(Mapping[str, Any]):
+    """
+    Read-only view of a payload with the parent lookups from the URL on top,
+    used instead of writing them into `request.data`.
+    """
+    def __init__(self, data: Mapping[str, Any], parent_lookups: Mapping[str, Any]) -> None:
+        self.data = data
+        self.parent_lookups = parent_lookups
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.parent_lookups:
+            return self.parent_lookups[key]
+        return self.data[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.parent_lookups or key in self.data
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.data
+        for key in self.parent_lookups:
+            if key not in self.data:
+                yield key
+
+    def __len__(self) -> int:
+        return len(self.data) + sum(1 for key in self.parent_lookups if key not in self.data)
+
+
+class ParentLookupQueryDictOverlay(ParentLookupOverlay):
+    """
+    `ParentLookupOverlay` of form data, which DRF reads as a `QueryDict`.
+    """
+    data: QueryDict
+
+    def getlist(self, key: str, default: list[Any] | None = None) -> list[Any]:
+        if key in self.parent_lookups:
+            return [self.parent_lookups[key]]
+        return self.data.getlist(key, default)
+
+    def lists(self) -> Iterator[tuple[str, list[Any]]]:
+        for key in self:
+            yield key, self.getlist(key)
+
+
+class ParentLookupListOverlay(list[Any]):
+    """
+    List payload whose items are read through `ParentLookupOverlay`. Only
+    the references are copied, the items themselves are left untouched.
+    """
+    def __init__(self, data: list[Any], parent_lookups: Mapping[str, Any]) -> None:
+        super().__init__(data)
+        self.parent_lookups = parent_lookups
+
+    def __iter__(self) -> Iterator[Any]:
+        for item in super().__iter__():
+            yield overlay_parent_lookups(item, self.parent_lookups)
+
+    def __getitem__(self, index: Any) -> Any:
+        item = super().__getitem__(index)
+        if isinstance(index, slice):
+            return [overlay_parent_lookups(value, self.parent_lookups) for value in item]
+        return overlay_parent_lookups(item, self.parent_lookups)
+
+
+def overlay_parent_lookups(data: Any, parent_lookups: Mapping[str, Any]) -> Any:
+    """
+    Returns `data` as serializers would see it after the parent lookups
+    were written into it, without touching `data`.
+    """
+    if isinstance(data, list):
+        return ParentLookupListOverlay(data, parent_lookups)
+    if isinstance(data, QueryDict):
+        return ParentLookupQueryDictOverlay(data, parent_lookups)
+    if isinstance(data, Mapping):
+        return ParentLookupOverlay(data, parent_lookups)
+    return data
+
+
 class NestedViewSetMixin(Generic[T_Model]):
+    # On list views, join the relations the serializer follows to build
+    # the nested hyperlinks, instead of loading them row by row. Skipped
+    # for querysets with deferred fields or combined with `union()`.
+    auto_select_related = False
+    # Respond 404 when the parents in the URL do not exist, instead of
+    # an empty list. Checked with a single query, once per request.
+    check_parent_existence = False
+    # Pass the parents from the URL to the serializer through an overlay of
+    # the payload and the `parent_lookups` context, instead of writing them
+    # into `request.data` and `request.query_params`.
+    parent_lookup_overlay = False
+    # Resolve `parent_lookup_kwargs` once per class. Set to False when they
+    # change between requests, e.g. with a dynamic `get_serializer_class()`.
+    cache_parent_lookup_plan = True
+
     def _get_parent_lookup_kwargs(self) -> dict[str, str]:
         """
         Locates and returns the `parent_lookup_kwargs` dict informing
@@ -48,6 +179,72 @@ class NestedViewSetMixin(Generic[T_Model]):
 
         return parent_lookup_kwargs
 
+    def _get_parent_lookup_plan(self, model: type[T_Model] | None = None) -> tuple[ParentLookup, ...]:
+        """
+        Returns the `parent_lookup_kwargs` resolved against `model`, built
+        once per class, or once per request when `cache_parent_lookup_plan`
+        is off.
+        """
+        if self.cache_parent_lookup_plan:
+            plans = _parent_lookup_plans.setdefault(type(self), {})
+        else:
+            plans = self.__dict__.setdefault('_parent_lookup_plans', {})
+        try:
+            return plans[model]
+        except KeyError:
+            plan = plans[model] = build_parent_lookup_plan(model, self._get_parent_lookup_kwargs())
+            return plan
+
+    def _get_parent_lookup_values(self, model: type[T_Model]) -> dict[str, Any]:
+        """
+        Returns the URL kwargs of `parent_lookup_kwargs`, converted to the
+        python type of the field they filter on, once per request.
+
+        Raises `NotFound` when a value is not valid for its field, so it
+        never reaches the database.
+        """
+        values: dict[str, Any] | None = self.__dict__.get('_parent_lookup_values')
+        if values is None:
+            values = {}
+            for lookup in self._get_parent_lookup_plan(model):
+                value = self.kwargs[lookup.url_kwarg]  # type: ignore[attr-defined]
+                if lookup.field is not None:
+                    try:
+                        value = lookup.field.to_python(value)
+                    except DjangoValidationError:
+                        raise NotFound()
+                values[lookup.url_kwarg] = value
+            self._parent_lookup_values = values
+        return values
+
+    def _get_parent_lookups(self) -> dict[str, Any]:
+        """
+        Returns the parent values from the URL, keyed by the field of the
+        model they fill, e.g. `{'parent': '1'}` for `'parent__pk'`.
+
+        A direct lookup, like `parent` or `parent__pk`, wins over deeper
+        paths starting from the same field.
+        """
+        parent_lookups: dict[str, Any] = {}
+        for lookup in self._get_parent_lookup_plan():
+            value = self.kwargs[lookup.url_kwarg]  # type: ignore[attr-defined]
+            if lookup.parent_filter == 'pk':
+                parent_lookups[lookup.parent_arg] = value
+            else:
+                parent_lookups.setdefault(lookup.parent_arg, value)
+        return parent_lookups
+
+    def get_serializer(self, *args: Any, **kwargs: Any) -> BaseSerializer[T_Model]:
+        if self.parent_lookup_overlay and 'data' in kwargs and not getattr(self, 'swagger_fake_view', False):
+            kwargs['data'] = overlay_parent_lookups(kwargs['data'], self._get_parent_lookups())
+        return super().get_serializer(*args, **kwargs)  # type: ignore[misc]
+
+    def get_serializer_context(self) -> dict[str, Any]:
+        context: dict[str, Any] = super().get_serializer_context()  # type: ignore[misc]
+        if self.parent_lookup_overlay and not getattr(self, 'swagger_fake_view', False):
+            context['parent_lookups'] = self._get_parent_lookups()
+        return context
+
     def get_queryset(self) -> QuerySet[T_Model]:
         """
         Filter the `QuerySet` based on its parents as defined in the
@@ -58,11 +255,94 @@ class NestedViewSetMixin(Generic[T_Model]):
         if getattr(self, 'swagger_fake_view', False):
             return queryset
 
-        orm_filters: dict[str, Any] = {}
-        parent_lookup_kwargs = self._get_parent_lookup_kwargs()
-        for query_param, field_name in parent_lookup_kwargs.items():
-            orm_filters[field_name] = self.kwargs[query_param]  # type: ignore[attr-defined]
-        return queryset.filter(**orm_filters)
+        self._check_parent_existence(queryset.model)
+
+        with timer('parent_filter'):
+            orm_filters: dict[str, Any] = {}
+            parent_lookup_values = self._get_parent_lookup_values(queryset.model)
+            for lookup in self._get_parent_lookup_plan(queryset.model):
+                orm_filters[lookup.orm_path] = parent_lookup_values[lookup.url_kwarg]
+            queryset = queryset.filter(**orm_filters)
+
+        # deferred fields can not be joined, nor can combined querysets
+        joinable = not queryset.query.deferred_loading[0] and not queryset.query.combinator
+        if self.auto_select_related and getattr(self, 'action', None) == 'list' and joinable:
+            queryset = self._get_related_lookups().apply(queryset)
+        return queryset
+
+    def _get_related_lookups(self) -> RelatedLookups:
+        """
+        Returns the related lookups planned for the serializer class,
+        computed once per class.
+        """
+        serializer_class: type[BaseSerializer[T_Model]] = self.get_serializer_class()  # type: ignore[attr-defined]
+        try:
+            return _related_lookups[serializer_class]
+        except KeyError:
+            # only views listing with auto_select_related need the serializers module
+            from rest_framework_nested.serializers import get_related_lookups
+
+            serializer = self.get_serializer()
+            lookups = _related_lookups[serializer_class] = get_related_lookups(serializer)
+            return lookups
+
+    def _check_parent_existence(self, model: type[T_Model]) -> None:
+        if self.check_parent_existence and not self._parent_exists(model):
+            raise NotFound()
+
+    def _parent_exists(self, model: type[T_Model]) -> bool:
+        """
+        Checks that the whole parent chain from the URL exists, with one
+        query joined across the `parent_lookup_kwargs` paths.
+
+        The result is cached on the request, so the check runs only once
+        no matter how many times the queryset is built.
+        """
+        cache, cache_key, groups = self._get_parent_existence_cache(model)
+        if cache_key not in cache:
+            try:
+                queryset = self._build_parent_existence_query(model, groups)
+                cache[cache_key] = queryset is None or timed('parent_exists', queryset.exists)
+            except (ValueError, TypeError):
+                # values that can not be a key of the parent, e.g. 'abc' for an int
+                cache[cache_key] = False
+        return cache[cache_key]
+
+    def _get_parent_existence_cache(
+        self, model: type[T_Model]
+    ) -> tuple[dict[tuple[Any, ...], bool], tuple[Any, ...], dict[str, dict[str, Any]]]:
+        """
+        Returns the existence checks cached on the request, the key of this
+        one, and the parent lookups grouped by the relation they start from.
+        """
+        # e.g. {'parent_pk': 'parent__pk', 'root_pk': 'parent__root__pk'}
+        # checks Parent.objects.filter(pk=parent_pk, root__pk=root_pk)
+        groups: dict[str, dict[str, Any]] = {}
+        parent_lookup_values = self._get_parent_lookup_values(model)
+        for lookup in self._get_parent_lookup_plan(model):
+            groups.setdefault(lookup.parent_arg, {})[lookup.parent_filter] = parent_lookup_values[lookup.url_kwarg]
+
+        request = getattr(self, 'request', None)
+        cache: dict[tuple[Any, ...], bool] = getattr(request, '_nested_parent_existence', {})
+        if request is not None:
+            request._nested_parent_existence = cache
+        cache_key = (model, tuple((parent_arg, tuple(filters.items())) for parent_arg, filters in groups.items()))
+        return cache, cache_key, groups
+
+    def _build_parent_existence_query(self, model: type[T_Model], groups: dict[str, dict[str, Any]]) -> QuerySet[Any] | None:
+        """
+        Returns the query of the parents in `groups`, or `None` when there
+        is no parent to check.
+        """
+        queryset = None
+        for parent_arg, filters in groups.items():
+            relation = get_relation(model, parent_arg)
+            if relation is None:
+                # not a relation, there is no parent to check
+                continue
+            parents = relation.related_model._default_manager.filter(**filters)  # type: ignore[union-attr]
+            queryset = parents if queryset is None else queryset.filter(Exists(parents))
+        return queryset
 
     def initial(self, request: Request, *args: Any, **kwargs: Any) -> None:
         """
@@ -74,13 +354,79 @@ class NestedViewSetMixin(Generic[T_Model]):
         if getattr(self, 'swagger_fake_view', False):
             return
 
-        for url_kwarg, fk_filter in self._get_parent_lookup_kwargs().items():
-            # fk_filter is alike 'grandparent__parent__pk'
-            parent_arg = fk_filter.partition('__')[0]
+        if self.check_parent_existence:
+            self._check_parent_existence(super().get_queryset().model)  # type: ignore[misc]
+
+        if self.parent_lookup_overlay:
+            # passed on by get_serializer() instead
+            return
+
+        for lookup in self._get_parent_lookup_plan():
+            # lookup.orm_path is alike 'grandparent__parent__pk'
             for querydict in [request.data, request.query_params]:
                 with _force_mutable(querydict):
                     if isinstance(querydict, list):  # type: ignore[unreachable]
                         for querydict_item in querydict:  # type: ignore[unreachable]
-                            querydict_item[parent_arg] = kwargs[url_kwarg]
+                            querydict_item[lookup.parent_arg] = kwargs[lookup.url_kwarg]
                     else:
-                        querydict[parent_arg] = kwargs[url_kwarg]
\ No newline at end of file
+                        querydict[lookup.parent_arg] = kwargs[lookup.url_kwarg]
+
+
+class AsyncNestedViewSetMixin(NestedViewSetMixin[T_Model]):
+    """
+    `NestedViewSetMixin` for async viewsets, like adrf's, whose actions
+    are coroutines:
+
+        class NameserverViewSet(AsyncNestedViewSetMixin, adrf.viewsets.ModelViewSet):
+            ...
+
+    For async actions, the parent existence check runs on the async ORM,
+    from `afilter_queryset()` and `perform_acreate()`, instead of from
+    `initial()` and `get_queryset()`. Sync actions are checked as usual.
+    """
+    def _check_parent_existence(self, model: type[T_Model]) -> None:
+        handler = getattr(self, getattr(self, 'action', None) or '', None)
+        if iscoroutinefunction(handler):
+            # checked by acheck_parent_existence() instead
+            return
+        super()._check_parent_existence(model)
+
+    async def acheck_parent_existence(self, model: type[T_Model] | None = None) -> None:
+        """
+        Raises `NotFound` when `check_parent_existence` is on and the
+        parents in the URL do not exist.
+        """
+        if not self.check_parent_existence or getattr(self, 'swagger_fake_view', False):
+            return
+        if model is None:
+            model = super(NestedViewSetMixin, self).get_queryset().model  # type: ignore[misc]
+        if not await self._aparent_exists(model):
+            raise NotFound()
+
+    async def _aparent_exists(self, model: type[T_Model]) -> bool:
+        """
+        `_parent_exists()` with the async ORM, sharing its cache.
+        """
+        cache, cache_key, groups = self._get_parent_existence_cache(model)
+        if cache_key not in cache:
+            try:
+                queryset = self._build_parent_existence_query(model, groups)
+                if queryset is None:
+                    cache[cache_key] = True
+                else:
+                    with timer('parent_exists'):
+                        cache[cache_key] = await queryset.aexists()
+            except (ValueError, TypeError):
+                cache[cache_key] = False
+        return cache[cache_key]
+
+    async def afilter_queryset(self, queryset: QuerySet[T_Model]) -> QuerySet[T_Model]:
+        await self.acheck_parent_existence(queryset.model)
+        afilter_queryset = getattr(super(), 'afilter_queryset', None)
+        if afilter_queryset is not None:
+            return await afilter_queryset(queryset)
+        return self.filter_queryset(queryset)  # type: ignore[attr-defined]
+
+    async def perform_acreate(self, serializer: BaseSerializer[T_Model]) -> None:
+        await self.acheck_parent_existence()
+        await super().perform_acreate(serializer)  # type: ignore[misc]
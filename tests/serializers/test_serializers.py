@@ -1,9 +1,20 @@
 import json
+from unittest import mock
+
 import pytest
-from django.test import TestCase
+from django.db import models
+from django.test import RequestFactory, TestCase
 from django.urls import reverse
+from rest_framework import serializers
+
+from rest_framework_nested.relations import NestedHyperlinkedIdentityField
+from rest_framework_nested.serializers import (
+    NestedHyperlinkedListSerializer, NestedHyperlinkedModelSerializer, NestedValuesListSerializer, get_related_lookups,
+)
 
-from tests.serializers.models import Parent, Child1, Child2, GrandChild1
+from tests.serializers.models import (
+    Parent, Child1, Child2, GrandChild1, Parent2Serializer, ParentChild2GrandChild1Serializer,
+)
 
 
 class TestSerializers(TestCase):
@@ -91,3 +102,174 @@ class TestSerializers(TestCase):
         data = self.get_json_response(url)
 
         self.assertEqual(len(data['first']), 0)
+
+    def test_related_lookups(self):
+        lookups = get_related_lookups(Parent2Serializer())
+        self.assertEqual(lookups.select_related, ())
+        self.assertEqual(lookups.prefetch_related, ('second', 'second__grand', 'second__grand__parent'))
+
+        lookups = get_related_lookups(ParentChild2GrandChild1Serializer())
+        self.assertEqual(lookups.select_related, ('parent',))
+        self.assertEqual(lookups.prefetch_related, ())
+
+    def test_nested_serializer_class_reused(self):
+        class DeepChild1Serializer(NestedHyperlinkedModelSerializer):
+            class Meta:
+                model = Child1
+                fields = ('url', 'name', 'parent')
+                depth = 1
+
+        first = DeepChild1Serializer().fields['parent']
+        second = DeepChild1Serializer().fields['parent']
+        self.assertIsNot(first, second)
+        self.assertIs(type(first), type(second))
+        self.assertEqual(first.Meta.model, Parent)
+        self.assertEqual(first.Meta.depth, 0)
+
+    def test_cache_fields(self):
+        calls = []
+
+        class CachedSerializer(ParentChild2GrandChild1Serializer):
+            cache_fields = True
+
+            def build_url_field(self, field_name, model_class):
+                calls.append(field_name)
+                return super().build_url_field(field_name, model_class)
+
+        first = CachedSerializer().fields
+        second = CachedSerializer().fields
+        self.assertEqual(calls, ['url'])
+        self.assertIsNot(first['url'], second['url'])
+        self.assertIs(second['url'].parent, second.serializer)
+        self.assertEqual(second['url'].parent_lookup_kwargs, ParentChild2GrandChild1Serializer.parent_lookup_kwargs)
+        self.assertEqual(list(first), list(ParentChild2GrandChild1Serializer().fields))
+
+        other = CachedSerializer(parent_lookup_kwargs={'parent_pk': 'parent__pk'}).fields
+        self.assertEqual(calls, ['url', 'url'])
+        self.assertEqual(other['url'].parent_lookup_kwargs, {'parent_pk': 'parent__pk'})
+
+
+class ValuesGrandChild1Serializer(ParentChild2GrandChild1Serializer):
+    class Meta(ParentChild2GrandChild1Serializer.Meta):
+        list_serializer_class = NestedValuesListSerializer
+
+
+class PkParentGrandChild1Serializer(NestedHyperlinkedModelSerializer):
+    parent_lookup_kwargs = ParentChild2GrandChild1Serializer.parent_lookup_kwargs
+    parent = serializers.PrimaryKeyRelatedField(read_only=True)
+
+    class Meta:
+        model = GrandChild1
+        fields = ('url', 'id', 'name', 'parent')
+        list_serializer_class = NestedValuesListSerializer
+
+
+class MethodGrandChild1Serializer(PkParentGrandChild1Serializer):
+    upper = serializers.SerializerMethodField()
+
+    class Meta(PkParentGrandChild1Serializer.Meta):
+        fields = ('url', 'name', 'upper')
+
+    def get_upper(self, obj):
+        return obj.name.upper()
+
+
+class Attachment(models.Model):
+    parent = models.ForeignKey(Child2, on_delete=models.CASCADE)
+    upload = models.FileField()
+
+
+class AttachmentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Attachment
+        fields = ('id', 'upload')
+        list_serializer_class = NestedValuesListSerializer
+
+
+class NameAttachmentSerializer(AttachmentSerializer):
+    upload = serializers.FileField(use_url=False)
+
+
+class TestNestedValuesListSerializer(TestCase):
+    def setUp(self):
+        parent = Parent.objects.create(name='Parent')
+        self.child2 = Child2.objects.create(root=parent, name='Child2')
+        for i in range(3):
+            GrandChild1.objects.create(parent=self.child2, name=f'Grand{i}')
+        self.context = {'request': RequestFactory().get('/')}
+        self.queryset = GrandChild1.objects.filter(parent=self.child2).order_by('pk')
+
+    def test_same_output(self):
+        expected = ParentChild2GrandChild1Serializer(self.queryset, many=True, context=self.context).data
+        with self.assertNumQueries(1):
+            data = ValuesGrandChild1Serializer(self.queryset.all(), many=True, context=self.context).data
+        self.assertEqual(data, expected)
+        self.assertEqual(len(data), 3)
+
+    def test_primary_key_relation(self):
+        with self.assertNumQueries(1):
+            data = PkParentGrandChild1Serializer(self.queryset, many=True, context=self.context).data
+        self.assertEqual(data[0]['parent'], self.child2.pk)
+        self.assertEqual(data[0]['name'], 'Grand0')
+        self.assertIn(f'/child2/{self.child2.pk}/grandchild1/{data[0]["id"]}/', data[0]['url'])
+
+    def test_fallback(self):
+        # unsupported fields
+        data = MethodGrandChild1Serializer(self.queryset, many=True, context=self.context).data
+        self.assertEqual([item['upper'] for item in data], ['GRAND0', 'GRAND1', 'GRAND2'])
+
+        # not a queryset
+        expected = ParentChild2GrandChild1Serializer(self.queryset, many=True, context=self.context).data
+        data = ValuesGrandChild1Serializer(list(self.queryset), many=True, context=self.context).data
+        self.assertEqual(data, expected)
+
+    def test_file_field(self):
+        Attachment.objects.create(parent=self.child2, upload='x/a.txt')
+        queryset = Attachment.objects.order_by('pk')
+        for serializer_class in (AttachmentSerializer, NameAttachmentSerializer):
+            expected = [serializer_class(attachment, context=self.context).data for attachment in queryset]
+            data = serializer_class(queryset.all(), many=True, context=self.context).data
+            self.assertEqual(data, expected)
+            self.assertIsNotNone(data[0]['upload'])
+
+
+class ListGrandChild1Serializer(ParentChild2GrandChild1Serializer):
+    class Meta(ParentChild2GrandChild1Serializer.Meta):
+        list_serializer_class = NestedHyperlinkedListSerializer
+
+
+class TestNestedHyperlinkedListSerializer(TestCase):
+    def setUp(self):
+        parent = Parent.objects.create(name='Parent')
+        self.child2 = Child2.objects.create(root=parent, name='Child2')
+        for i in range(3):
+            GrandChild1.objects.create(parent=self.child2, name=f'Grand{i}')
+        self.queryset = GrandChild1.objects.filter(parent=self.child2).select_related('parent').order_by('pk')
+
+    def assertSameOutput(self, context):
+        expected = ParentChild2GrandChild1Serializer(self.queryset, many=True, context=context).data
+        with mock.patch.object(NestedHyperlinkedIdentityField, '_reverse_url') as reverse_url:
+            data = ListGrandChild1Serializer(self.queryset, many=True, context=context).data
+        reverse_url.assert_not_called()
+        self.assertEqual(data, expected)
+        self.assertEqual(len(data), 3)
+        self.assertIs(type(data[0]['url']), str)
+        return data
+
+    def test_same_output(self):
+        data = self.assertSameOutput({'request': RequestFactory().get('/')})
+        self.assertTrue(data[0]['url'].startswith('http://testserver/'))
+
+    def test_query_params(self):
+        data = self.assertSameOutput({'request': RequestFactory().get('/', {'format': 'json'})})
+        self.assertTrue(data[0]['url'].endswith('/?format=json'))
+
+    def test_no_request(self):
+        data = self.assertSameOutput({'request': None})
+        self.assertTrue(data[0]['url'].startswith('/'))
+
+    def test_fallback(self):
+        # URL format suffixes are reversed row by row
+        context = {'request': RequestFactory().get('/'), 'format': 'json'}
+        field = ListGrandChild1Serializer(context=context).fields['url']
+        self.assertIsNone(field.get_urls(list(self.queryset)))
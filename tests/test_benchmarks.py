@@ -0,0 +1,12 @@
+from django.test import TestCase
+
+from benchmarks.__main__ import run_all
+
+
+class TestBenchmarks(TestCase):
+    def test_quick_run(self):
+        results = run_all(quick=True)
+        self.assertEqual(set(results['benchmarks']), {'routers', 'urls', 'serializers', 'viewsets', 'imports'})
+        self.assertEqual(set(results['benchmarks']['serializers']), {'10'})
+        for seconds in results['benchmarks']['urls'].values():
+            self.assertGreater(seconds, 0)
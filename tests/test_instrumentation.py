@@ -0,0 +1,94 @@
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework_nested import instrumentation
+from rest_framework_nested.instrumentation import collect, get_stats, stats_collected
+from rest_framework_nested.relations import NestedHyperlinkedRelatedField
+
+from tests.serializers.models import Child1, Child2, GrandChild1, Parent, ParentChild2GrandChild1Serializer
+
+factory = RequestFactory()
+
+collected = []
+
+
+def callback_sink(stats, request):
+    collected.append((stats.as_dict(), request.path))
+
+
+class TestInstrumentation(TestCase):
+    def setUp(self):
+        self.parent = Parent.objects.create(name='Parent')
+        self.child2 = Child2.objects.create(root=self.parent, name='Child2')
+        for i in range(3):
+            GrandChild1.objects.create(parent=self.child2, name=f'Grand{i}')
+        self.request = factory.get('/')
+
+    def render(self, queryset):
+        return ParentChild2GrandChild1Serializer(queryset, many=True, context={'request': self.request}).data
+
+    def test_disabled(self):
+        self.assertIsNone(get_stats())
+        self.render(GrandChild1.objects.filter(parent=self.child2))
+        self.assertIsNone(get_stats())
+
+    def test_reverse_and_lazy_loads(self):
+        with collect() as stats:
+            self.render(GrandChild1.objects.filter(parent=self.child2))
+        # the identity url and the parent url of each row
+        self.assertEqual(stats.counters['reverse'], 6)
+        self.assertGreater(stats.timers['reverse'], 0)
+        # grandchild.parent is loaded for every row
+        self.assertEqual(stats.counters['lazy_loads'], 3)
+
+        with collect() as stats:
+            self.render(GrandChild1.objects.filter(parent=self.child2).select_related('parent'))
+        self.assertNotIn('lazy_loads', stats.counters)
+        self.assertGreater(stats.counters['getattr_hops'], 0)
+
+    def test_get_object(self):
+        child = Child1.objects.create(parent=self.parent, name='Child1')
+        field = NestedHyperlinkedRelatedField(view_name='child1-detail', queryset=Child1.objects.all())
+        url = reverse('child1-detail', kwargs={'parent_pk': self.parent.pk, 'pk': child.pk})
+
+        with collect() as stats:
+            field.to_internal_value(url)
+            NestedHyperlinkedRelatedField(many=True, view_name='child1-detail', queryset=Child1.objects.all()).to_internal_value([url, url])
+        self.assertEqual(stats.counters['get_object'], 2)
+
+    def test_signal_sink(self):
+        received = []
+
+        def receiver(sender, stats, request, **kwargs):
+            received.append((stats, request))
+
+        stats_collected.connect(receiver)
+        try:
+            with collect(instrumentation.signal_sink, request=self.request) as stats:
+                self.render(GrandChild1.objects.filter(parent=self.child2))
+        finally:
+            stats_collected.disconnect(receiver)
+        self.assertEqual(received, [(stats, self.request)])
+
+    def test_logging_sink(self):
+        with self.assertLogs('rest_framework_nested.instrumentation', 'INFO') as logs:
+            with collect(instrumentation.logging_sink, request=self.request):
+                self.render(GrandChild1.objects.filter(parent=self.child2))
+        self.assertIn("GET /: {'counters': {", logs.output[0])
+
+    @override_settings(
+        MIDDLEWARE=['rest_framework_nested.instrumentation.InstrumentationMiddleware'],
+        DRF_NESTED_INSTRUMENTATION_SINKS=['tests.test_instrumentation.callback_sink'],
+    )
+    def test_middleware(self):
+        collected.clear()
+        url = reverse('parent2-detail', kwargs={'pk': self.parent.pk})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(collected), 1)
+        stats, path = collected[0]
+        self.assertEqual(path, url)
+        # the url of the Child2, and of each GrandChild1 and its parent
+        self.assertEqual(stats['counters']['reverse'], 7)
+        # the parents of the grandchildren are known from the related manager
+        self.assertNotIn('lazy_loads', stats['counters'])
@@ -0,0 +1,444 @@
+import json
+
+import datetime
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, models
+from django.http import StreamingHttpResponse
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path, reverse
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.permissions import BasePermission
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.response import Response
+from rest_framework.viewsets import ModelViewSet
+
+from rest_framework_nested.mixins import BulkWriteMixin, ConditionalListMixin, ParentCacheMixin, StreamingListMixin
+from rest_framework_nested.routers import NestedSimpleRouter
+from rest_framework_nested.viewsets import NestedViewSetMixin
+
+from tests.serializers.models import Child2, GrandChild1, Parent, ParentChild2GrandChild1Serializer
+from tests.serializers.urls import parent_2_router, urlpatterns as serializers_urlpatterns
+
+
+class NamesRenderer(BaseRenderer):
+    media_type = 'text/plain'
+    format = 'txt'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return ','.join(item['name'] for item in data)
+
+
+class StreamingGrandChild1ViewSet(StreamingListMixin, NestedViewSetMixin, ModelViewSet):
+    parent_lookup_kwargs = ParentChild2GrandChild1Serializer.parent_lookup_kwargs
+    serializer_class = ParentChild2GrandChild1Serializer
+    queryset = GrandChild1.objects.order_by('pk')
+    renderer_classes = (JSONRenderer, NamesRenderer)
+    stream_chunk_size = 2
+
+
+class PaginatedStreamingGrandChild1ViewSet(StreamingGrandChild1ViewSet):
+    pagination_class = LimitOffsetPagination
+
+
+class CachedGrandChild1ViewSet(ParentCacheMixin, NestedViewSetMixin, ModelViewSet):
+    auto_select_related = True
+    parent_lookup_kwargs = ParentChild2GrandChild1Serializer.parent_lookup_kwargs
+    parent_lookup_overlay = True
+    serializer_class = ParentChild2GrandChild1Serializer
+    queryset = GrandChild1.objects.order_by('pk')
+
+
+class DenyHeaderPermission(BasePermission):
+    def has_object_permission(self, request, view, obj):
+        return 'X-Deny' not in request.headers
+
+
+class PermissionCachedGrandChild1ViewSet(CachedGrandChild1ViewSet):
+    permission_classes = (DenyHeaderPermission,)
+
+
+class ConditionalGrandChild1ViewSet(ConditionalListMixin, NestedViewSetMixin, ModelViewSet):
+    parent_lookup_kwargs = ParentChild2GrandChild1Serializer.parent_lookup_kwargs
+    serializer_class = ParentChild2GrandChild1Serializer
+    queryset = GrandChild1.objects.order_by('pk')
+
+
+class ConditionalCachedGrandChild1ViewSet(ConditionalListMixin, CachedGrandChild1ViewSet):
+    pass
+
+
+class Note(models.Model):
+    text = models.CharField(max_length=10)
+    parent = models.ForeignKey(Child2, on_delete=models.CASCADE)
+    updated_at = models.DateTimeField()
+
+
+class NoteSerializer(ParentChild2GrandChild1Serializer):
+    class Meta:
+        model = Note
+        fields = ('text',)
+
+
+class ConditionalNoteViewSet(ConditionalListMixin, NestedViewSetMixin, ModelViewSet):
+    parent_lookup_kwargs = ParentChild2GrandChild1Serializer.parent_lookup_kwargs
+    serializer_class = NoteSerializer
+    queryset = Note.objects.all()
+    last_modified_field = 'updated_at'
+
+
+class BulkGrandChild1ViewSet(BulkWriteMixin, CachedGrandChild1ViewSet):
+    pass
+
+
+class LockedPermission(BasePermission):
+    def has_object_permission(self, request, view, obj):
+        return obj.name != 'Locked'
+
+
+class PermissionBulkGrandChild1ViewSet(BulkGrandChild1ViewSet):
+    permission_classes = (LockedPermission,)
+
+
+router = NestedSimpleRouter(parent_2_router, r'child2', lookup='parent')
+router.register(r'streamed', StreamingGrandChild1ViewSet, basename='streamed')
+router.register(r'paginated', PaginatedStreamingGrandChild1ViewSet, basename='paginated')
+router.register(r'cached', CachedGrandChild1ViewSet, basename='cached')
+router.register(r'permission-cached', PermissionCachedGrandChild1ViewSet, basename='permission-cached')
+router.register(r'conditional', ConditionalGrandChild1ViewSet, basename='conditional')
+router.register(r'conditional-cached', ConditionalCachedGrandChild1ViewSet, basename='conditional-cached')
+router.register(r'notes', ConditionalNoteViewSet, basename='notes')
+router.register(r'bulk', BulkGrandChild1ViewSet, basename='bulk')
+router.register(r'permission-bulk', PermissionBulkGrandChild1ViewSet, basename='permission-bulk')
+
+urlpatterns = serializers_urlpatterns + [
+    path('', include(router.urls)),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class TestStreamingListMixin(TestCase):
+    def setUp(self):
+        parent = Parent.objects.create(name='Parent')
+        self.child2 = Child2.objects.create(root=parent, name='Child2')
+        other = Child2.objects.create(root=parent, name='Other')
+        for i in range(5):
+            GrandChild1.objects.create(parent=self.child2, name=f'Grand{i}')
+        GrandChild1.objects.create(parent=other, name='Other')
+        self.kwargs = {'root_pk': parent.pk, 'parent_pk': self.child2.pk}
+
+    def test_streamed(self):
+        response = self.client.get(reverse('streamed-list', kwargs=self.kwargs))
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertEqual(response['Content-Type'], 'application/json')
+
+        chunks = list(response.streaming_content)
+        # 5 rows, by 2
+        self.assertEqual(len(chunks), 3)
+        data = json.loads(b''.join(chunks))
+
+        expected = self.client.get(reverse('grandchild1-list', kwargs=self.kwargs)).json()
+        expected = [item for item in expected if item['parent'].endswith(f'/child2/{self.child2.pk}/')]
+        self.assertEqual(data, expected)
+        self.assertEqual([item['name'] for item in data], [f'Grand{i}' for i in range(5)])
+
+    def test_empty(self):
+        self.kwargs['parent_pk'] = 0
+        response = self.client.get(reverse('streamed-list', kwargs=self.kwargs))
+        self.assertEqual(b''.join(response.streaming_content), b'[]')
+
+    def test_paginated(self):
+        response = self.client.get(reverse('paginated-list', kwargs=self.kwargs), {'limit': 2})
+        self.assertIsInstance(response, Response)
+        data = response.json()
+        self.assertEqual(data['count'], 5)
+        self.assertEqual([item['name'] for item in data['results']], ['Grand0', 'Grand1'])
+
+    def test_other_renderer(self):
+        response = self.client.get(reverse('streamed-list', kwargs=self.kwargs), {'format': 'txt'})
+        self.assertIsInstance(response, Response)
+        self.assertEqual(response.content, b'Grand0,Grand1,Grand2,Grand3,Grand4')
+
+
+@override_settings(
+    ROOT_URLCONF=__name__,
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test_mixins'}},
+)
+class TestParentCacheMixin(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.parent = Parent.objects.create(name='Parent')
+        self.child2 = Child2.objects.create(root=self.parent, name='Child2')
+        self.other = Child2.objects.create(root=self.parent, name='Other')
+        self.grandchild = GrandChild1.objects.create(parent=self.child2, name='Grand')
+        GrandChild1.objects.create(parent=self.other, name='Other')
+
+    def url(self, child2, pk=None):
+        kwargs = {'root_pk': self.parent.pk, 'parent_pk': child2.pk}
+        if pk is None:
+            return reverse('cached-list', kwargs=kwargs)
+        return reverse('cached-detail', kwargs=dict(kwargs, pk=pk))
+
+    def names(self, child2):
+        return [item['name'] for item in self.client.get(self.url(child2)).json()]
+
+    def test_cached(self):
+        self.assertEqual(self.names(self.child2), ['Grand'])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.names(self.child2), ['Grand'])
+        # the query string is part of the key
+        with self.assertNumQueries(1):
+            self.client.get(self.url(self.child2), {'format': 'json'})
+
+        self.client.get(self.url(self.child2, self.grandchild.pk))
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url(self.child2, self.grandchild.pk)).json()['name'], 'Grand')
+
+    def test_expired_by_writes(self):
+        self.assertEqual(self.names(self.child2), ['Grand'])
+        self.assertEqual(self.names(self.other), ['Other'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url(self.child2), {'name': 'New', 'parent': 'ignored'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.names(self.child2), ['Grand', 'New'])
+
+        # other parents stay cached
+        with self.assertNumQueries(0):
+            self.assertEqual(self.names(self.other), ['Other'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(self.url(self.child2, self.grandchild.pk), {'name': 'Renamed'}, content_type='application/json')
+        self.assertEqual(self.names(self.child2), ['Renamed', 'New'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(self.url(self.child2, self.grandchild.pk))
+        self.assertEqual(self.names(self.child2), ['New'])
+
+    def test_errors_not_cached(self):
+        self.assertEqual(self.client.get(self.url(self.child2, 0)).status_code, 404)
+        GrandChild1.objects.create(pk=12345, parent=self.child2, name='Late')
+        self.assertEqual(self.client.get(self.url(self.child2, 12345)).status_code, 200)
+
+    def test_parent_cache_key(self):
+        def parent_cache_key(parent_lookup_kwargs, **kwargs):
+            viewset = type('ViewSet', (CachedGrandChild1ViewSet,), {'parent_lookup_kwargs': parent_lookup_kwargs})
+            return viewset(basename='cached', kwargs=kwargs).get_parent_cache_key()
+
+        key = parent_cache_key({'parent_pk': 'parent__pk'}, parent_pk=self.parent.pk)
+        # same URL kwarg and basename, filtering on another parent
+        self.assertNotEqual(key, parent_cache_key({'parent_pk': 'parent__root__pk'}, parent_pk=self.parent.pk))
+        # same filter under another URL kwarg
+        self.assertEqual(key, parent_cache_key({'pk': 'parent__pk'}, pk=str(self.parent.pk)))
+
+    def test_object_permissions(self):
+        url = reverse('permission-cached-detail', kwargs={'root_pk': self.parent.pk, 'parent_pk': self.child2.pk, 'pk': self.grandchild.pk})
+        self.assertEqual(self.client.get(url).status_code, 200)
+        # cached, the object is still checked
+        self.assertEqual(self.client.get(url, headers={'X-Deny': '1'}).status_code, 403)
+        self.assertEqual(self.client.get(url).json()['name'], 'Grand')
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+    def test_dummy_cache(self):
+        # no version counter kept, nothing cached
+        self.assertEqual(self.names(self.child2), ['Grand'])
+        GrandChild1.objects.create(parent=self.child2, name='New')
+        self.assertEqual(self.names(self.child2), ['Grand', 'New'])
+        self.assertEqual(self.client.get(self.url(self.child2, self.grandchild.pk)).json()['name'], 'Grand')
+
+
+@override_settings(
+    ROOT_URLCONF=__name__,
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test_mixins'}},
+)
+class TestConditionalListMixin(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.parent = Parent.objects.create(name='Parent')
+        self.child2 = Child2.objects.create(root=self.parent, name='Child2')
+        self.grandchild = GrandChild1.objects.create(parent=self.child2, name='Grand')
+        self.kwargs = {'root_pk': self.parent.pk, 'parent_pk': self.child2.pk}
+
+    def create_note(self, text, second):
+        updated_at = datetime.datetime(2024, 1, 2, 3, 4, second, tzinfo=datetime.timezone.utc)
+        return Note.objects.create(parent=self.child2, text=text, updated_at=updated_at)
+
+    def test_etag(self):
+        self.create_note('Note', 5)
+        url = reverse('notes-list', kwargs=self.kwargs)
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertNotIn('Last-Modified', response)
+
+        # one aggregate query, nothing serialized
+        with self.assertNumQueries(1):
+            response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        # other pages and media types have their own
+        self.assertEqual(self.client.get(url, {'format': 'json'}, headers={'If-None-Match': etag}).status_code, 200)
+
+        self.create_note('New', 6)
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 2)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_update_in_place(self):
+        note = self.create_note('Note', 5)
+        self.create_note('Latest', 9)
+        url = reverse('notes-list', kwargs=self.kwargs)
+        etag = self.client.get(url)['ETag']
+
+        note.text = 'Edited'
+        note.updated_at = note.updated_at.replace(year=2025)
+        note.save()
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn({'text': 'Edited'}, response.json())
+
+    def test_delete(self):
+        note = self.create_note('Note', 5)
+        self.create_note('Latest', 9)
+        url = reverse('notes-list', kwargs=self.kwargs)
+        etag = self.client.get(url)['ETag']
+
+        note.delete()
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [{'text': 'Latest'}])
+
+        # the latest row is unchanged, If-Modified-Since is not honored
+        response = self.client.get(url, headers={'If-Modified-Since': 'Tue, 02 Jan 2024 03:04:09 GMT'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [{'text': 'Latest'}])
+
+    def test_parent_version(self):
+        url = reverse('conditional-cached-list', kwargs=self.kwargs)
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url, {'name': 'New'})
+        self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 200)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+    def test_parent_version_not_kept(self):
+        url = reverse('conditional-cached-list', kwargs=self.kwargs)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+
+    def test_improperly_configured(self):
+        with self.assertRaises(ImproperlyConfigured):
+            self.client.get(reverse('conditional-list', kwargs=self.kwargs))
+
+
+@override_settings(
+    ROOT_URLCONF=__name__,
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test_mixins'}},
+)
+class TestBulkWriteMixin(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.parent = Parent.objects.create(name='Parent')
+        self.child2 = Child2.objects.create(root=self.parent, name='Child2')
+        self.other = Child2.objects.create(root=self.parent, name='Other')
+        self.other_grandchild = GrandChild1.objects.create(parent=self.other, name='Other')
+        self.url = reverse('bulk-list', kwargs={'root_pk': self.parent.pk, 'parent_pk': self.child2.pk})
+
+    def send(self, method, data):
+        with self.captureOnCommitCallbacks(execute=True):
+            return getattr(self.client, method)(self.url, data, content_type='application/json')
+
+    def names(self):
+        return list(GrandChild1.objects.filter(parent=self.child2).order_by('pk').values_list('name', flat=True))
+
+    def test_create(self):
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.send('post', [{'name': f'Grand{i}'} for i in range(50)])
+        self.assertEqual(response.status_code, 201)
+        self.assertLess(len(queries), 10)
+        self.assertEqual(self.names(), [f'Grand{i}' for i in range(50)])
+        self.assertIn(f'/child2/{self.child2.pk}/grandchild1/', response.json()[0]['url'])
+        # expired the cached list
+        self.assertEqual(len(self.client.get(self.url).json()), 50)
+
+        # single items are created as usual
+        self.assertEqual(self.send('post', {'name': 'Single'}).status_code, 201)
+        self.assertEqual(self.names()[-1], 'Single')
+
+    def test_create_invalid(self):
+        response = self.send('post', [{'name': 'Valid'}, {'name': 'Far too long'}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.json()), ['1'])
+        self.assertIn('name', response.json()['1'])
+        self.assertEqual(self.names(), [])
+
+    def test_missing_parent(self):
+        self.url = reverse('bulk-list', kwargs={'root_pk': self.parent.pk, 'parent_pk': 0})
+        self.assertEqual(self.send('post', [{'name': 'Grand'}]).status_code, 404)
+
+    def test_update(self):
+        first, second = [GrandChild1.objects.create(parent=self.child2, name=f'Grand{i}') for i in range(2)]
+        response = self.send('patch', [{'id': first.pk, 'name': 'First'}, {'id': str(second.pk), 'name': 'Second'}])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.names(), ['First', 'Second'])
+
+        response = self.send('put', [{'id': first.pk, 'name': 'Renamed'}, {'id': self.other_grandchild.pk, 'name': 'Moved'}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'1': {'id': ['Not found.']}})
+        self.assertEqual(self.names(), ['First', 'Second'])
+        self.other_grandchild.refresh_from_db()
+        self.assertEqual(self.other_grandchild.name, 'Other')
+
+    def test_update_duplicates(self):
+        first = GrandChild1.objects.create(parent=self.child2, name='Grand')
+        response = self.send('patch', [{'id': first.pk, 'name': 'First'}, {'id': first.pk, 'name': 'Second'}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'1': {'id': ['Duplicate value.']}})
+        self.assertEqual(self.names(), ['Grand'])
+
+    def test_destroy(self):
+        grandchildren = [GrandChild1.objects.create(parent=self.child2, name=f'Grand{i}') for i in range(3)]
+        response = self.send('delete', [grandchildren[0].pk, grandchildren[2].pk])
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.names(), ['Grand1'])
+
+        # rows of other parents, unknown and repeated ids
+        response = self.send('delete', [grandchildren[1].pk, self.other_grandchild.pk, 0, grandchildren[1].pk])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {
+            '1': {'id': ['Not found.']},
+            '2': {'id': ['Not found.']},
+            '3': {'id': ['Duplicate value.']},
+        })
+        self.assertEqual(self.names(), ['Grand1'])
+        self.assertTrue(GrandChild1.objects.filter(pk=self.other_grandchild.pk).exists())
+
+        self.assertEqual(self.send('delete', []).status_code, 400)
+
+    def test_object_permissions(self):
+        grand = GrandChild1.objects.create(parent=self.child2, name='Grand')
+        locked = GrandChild1.objects.create(parent=self.child2, name='Locked')
+        self.url = reverse('permission-bulk-list', kwargs={'root_pk': self.parent.pk, 'parent_pk': self.child2.pk})
+
+        response = self.send('patch', [{'id': grand.pk, 'name': 'Renamed'}, {'id': locked.pk, 'name': 'Unlocked'}])
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.names(), ['Grand', 'Locked'])
+
+        self.assertEqual(self.send('delete', [grand.pk, locked.pk]).status_code, 403)
+        self.assertEqual(self.names(), ['Grand', 'Locked'])
+
+        self.assertEqual(self.send('delete', [grand.pk]).status_code, 204)
+        self.assertEqual(self.names(), ['Locked'])
+
+    def test_routes(self):
+        url = reverse('cached-list', kwargs={'root_pk': self.parent.pk, 'parent_pk': self.child2.pk})
+        self.assertEqual(self.client.delete(url).status_code, 405)
@@ -0,0 +1,29 @@
+from django.test import SimpleTestCase
+
+import rest_framework_nested
+from rest_framework_nested.routers import NestedSimpleRouter
+
+from benchmarks.imports import import_module
+
+
+class TestLazyExports(SimpleTestCase):
+    def test_exports(self):
+        self.assertIs(rest_framework_nested.NestedSimpleRouter, NestedSimpleRouter)
+        self.assertIn('NestedHyperlinkedModelSerializer', dir(rest_framework_nested))
+        for name in rest_framework_nested.__all__:
+            self.assertTrue(hasattr(rest_framework_nested, name), name)
+
+    def test_unknown_name(self):
+        with self.assertRaises(AttributeError):
+            rest_framework_nested.NestedRouter
+
+    def test_no_import_side_effects(self):
+        _seconds, imported = import_module('rest_framework_nested')
+        self.assertEqual([name for name in imported if name.startswith('rest_framework_nested.')], [])
+
+        _seconds, imported = import_module('rest_framework_nested.routers')
+        self.assertNotIn('rest_framework_nested.serializers', imported)
+        self.assertNotIn('rest_framework_nested.relations', imported)
+
+        _seconds, imported = import_module('rest_framework_nested.viewsets')
+        self.assertNotIn('rest_framework_nested.serializers', imported)
@@ -0,0 +1,97 @@
+import warnings
+
+from django.db import models
+from django.test import TestCase, override_settings
+from django.urls import include, path, reverse
+from rest_framework.viewsets import ModelViewSet
+
+from rest_framework_nested.pagination import MissingIndexWarning, NestedCursorPagination, _checked_indexes
+from rest_framework_nested.routers import NestedSimpleRouter
+from rest_framework_nested.viewsets import NestedViewSetMixin
+
+from tests.test_viewsets import Child, ChildSerializer, Root, router
+
+
+class IndexedChild(models.Model):
+    name = models.CharField(max_length=255)
+    parent = models.ForeignKey(Root, on_delete=models.CASCADE)
+
+    class Meta:
+        indexes = [models.Index(fields=['parent', 'id'])]
+
+
+class IndexedChildSerializer(ChildSerializer):
+    class Meta(ChildSerializer.Meta):
+        model = IndexedChild
+
+
+class ChildPagination(NestedCursorPagination):
+    page_size = 2
+
+
+class PaginatedChildViewSet(NestedViewSetMixin, ModelViewSet):
+    serializer_class = ChildSerializer
+    queryset = Child.objects.all()
+    pagination_class = ChildPagination
+
+
+class PaginatedIndexedChildViewSet(PaginatedChildViewSet):
+    serializer_class = IndexedChildSerializer
+    queryset = IndexedChild.objects.all()
+
+
+root_router = NestedSimpleRouter(router, r'root', lookup='parent')
+root_router.register(r'paginated', PaginatedChildViewSet, basename='paginated')
+root_router.register(r'paginated-indexed', PaginatedIndexedChildViewSet, basename='paginated-indexed')
+
+urlpatterns = [
+    path('', include(router.urls)),
+    path('', include(root_router.urls)),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class TestNestedCursorPagination(TestCase):
+    def setUp(self):
+        self.root_1 = Root.objects.create(name='root-1')
+        self.root_2 = Root.objects.create(name='root-2')
+        for i in range(5):
+            Child.objects.create(name=f'root-1-child-{i}', parent=self.root_1)
+            IndexedChild.objects.create(name=f'root-1-child-{i}', parent=self.root_1)
+        Child.objects.create(name='root-2-child', parent=self.root_2)
+        IndexedChild.objects.create(name='root-2-child', parent=self.root_2)
+
+    def test_pages(self):
+        url = reverse('paginated-indexed-list', kwargs={'parent_pk': self.root_1.pk})
+        names = []
+        while url:
+            data = self.client.get(url).json()
+            names += [child['name'] for child in data['results']]
+            url = data['next']
+        self.assertEqual(names, [f'root-1-child-{i}' for i in range(5)])
+
+    def test_cursor_of_other_parent(self):
+        data = self.client.get(reverse('paginated-indexed-list', kwargs={'parent_pk': self.root_1.pk})).json()
+        cursor = data['next'].split('cursor=')[1]
+
+        url = reverse('paginated-indexed-list', kwargs={'parent_pk': self.root_2.pk})
+        response = self.client.get(url, {'cursor': cursor})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {'detail': 'Invalid cursor'})
+
+    def test_index_fields(self):
+        view = PaginatedChildViewSet(kwargs={'parent_pk': self.root_1.pk})
+        pagination = ChildPagination()
+        self.assertEqual(pagination.get_index_fields(Child, None, view), ['parent', 'id'])
+
+    def test_missing_index(self):
+        _checked_indexes.clear()
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.client.get(reverse('paginated-list', kwargs={'parent_pk': self.root_1.pk}))
+            # once per view
+            self.client.get(reverse('paginated-list', kwargs={'parent_pk': self.root_1.pk}))
+            response = self.client.get(reverse('paginated-indexed-list', kwargs={'parent_pk': self.root_1.pk}))
+        self.assertEqual([warning.category for warning in caught], [MissingIndexWarning])
+        self.assertIn("models.Index(fields=['parent', 'id'])", str(caught[0].message))
+        self.assertEqual(len(response.json()['results']), 2)
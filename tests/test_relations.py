@@ -0,0 +1,219 @@
+from django.core.exceptions import SynchronousOnlyOperation
+from django.db.models import F
+from django.test import RequestFactory, TestCase
+from django.urls import NoReverseMatch, reverse, set_script_prefix, clear_script_prefix
+from rest_framework.relations import ManyRelatedField
+from rest_framework.serializers import Serializer
+
+from rest_framework_nested.lookups import compile_lookup
+from rest_framework_nested.relations import (
+    AsyncNestedHyperlinkedIdentityField, AsyncNestedHyperlinkedRelatedField, NestedHyperlinkedRelatedField, NestedManyRelatedField,
+)
+from rest_framework_nested.reverse import template_reverse
+
+from tests.serializers.models import Parent, Child1, Child2, GrandChild1, ParentChild2GrandChild1Serializer
+
+factory = RequestFactory()
+
+
+class TestURLTemplate(TestCase):
+    def setUp(self):
+        self.parent = Parent.objects.create(name='Parent')
+        self.child1 = Child1.objects.create(parent=self.parent, name='Child1')
+        self.child2 = Child2.objects.create(root=self.parent, name='Child2')
+        self.grandchild = GrandChild1.objects.create(parent=self.child2, name='Grand')
+        self.request = factory.get('/parent1/')
+
+    def get_urls(self, obj, view_name, **kwargs):
+        request = kwargs.pop('request', self.request)
+        fmt = kwargs.pop('format', None)
+        slow = NestedHyperlinkedRelatedField(view_name=view_name, read_only=True, **kwargs)
+        fast = NestedHyperlinkedRelatedField(view_name=view_name, read_only=True, use_url_template=True, **kwargs)
+        return (
+            slow.get_url(obj, view_name, request, fmt),
+            fast.get_url(obj, view_name, request, fmt),
+        )
+
+    def test_identical_output(self):
+        slow, fast = self.get_urls(self.child1, 'child1-detail')
+        self.assertEqual(slow, 'http://testserver/parent1/%s/child1/%s/' % (self.parent.pk, self.child1.pk))
+        self.assertEqual(fast, slow)
+
+    def test_identical_output_multi_level(self):
+        slow, fast = self.get_urls(
+            self.grandchild, 'grandchild1-detail',
+            parent_lookup_kwargs={'parent_pk': 'parent__pk', 'root_pk': 'parent__root__pk'},
+        )
+        self.assertEqual(fast, slow)
+
+    def test_identical_output_without_request(self):
+        slow, fast = self.get_urls(self.child1, 'child1-detail', request=None)
+        self.assertEqual(slow, '/parent1/%s/child1/%s/' % (self.parent.pk, self.child1.pk))
+        self.assertEqual(fast, slow)
+
+    def test_identical_output_with_script_prefix(self):
+        set_script_prefix('/api/')
+        try:
+            slow, fast = self.get_urls(self.child1, 'child1-detail')
+        finally:
+            clear_script_prefix()
+        self.assertIn('/api/parent1/', slow)
+        self.assertEqual(fast, slow)
+
+    def test_identical_output_with_quoting(self):
+        self.child1.name = 'a b\u00fc'
+        slow, fast = self.get_urls(self.child1, 'child1-detail', lookup_field='name', lookup_url_kwarg='pk')
+        self.assertIn('/a%20b%C3%BC/', slow)
+        self.assertEqual(fast, slow)
+
+    def test_format_falls_back_to_reverse(self):
+        kwargs = {'parent_pk': self.parent.pk, 'pk': self.child1.pk}
+        self.assertIsNotNone(template_reverse('child1-detail', kwargs, request=self.request))
+        self.assertIsNone(template_reverse('child1-detail', kwargs, request=self.request, format='json'))
+
+    def test_parent_pk_read_from_fk_attname(self):
+        child = Child1.objects.get(pk=self.child1.pk)
+        field = NestedHyperlinkedRelatedField(view_name='child1-detail', read_only=True)
+        with self.assertNumQueries(0):
+            url = field.get_url(child, 'child1-detail', self.request, None)
+        self.assertEqual(url, 'http://testserver/parent1/%s/child1/%s/' % (self.parent.pk, child.pk))
+
+    def test_no_match_falls_back_to_reverse(self):
+        # '/' is not accepted by the lookup regex, so reverse() must complain
+        self.child1.name = 'with/slash'
+        field = NestedHyperlinkedRelatedField(
+            view_name='child1-detail', read_only=True, lookup_field='name', lookup_url_kwarg='pk',
+            use_url_template=True,
+        )
+        with self.assertRaises(NoReverseMatch):
+            field.get_url(self.child1, 'child1-detail', self.request, None)
+
+
+class TestNestedManyRelatedField(TestCase):
+    def setUp(self):
+        self.parent = Parent.objects.create(name='Parent')
+        self.other_parent = Parent.objects.create(name='Other')
+        self.children = [Child1.objects.create(parent=self.parent, name=f'Child1-{i}') for i in range(3)]
+        self.other_child = Child1.objects.create(parent=self.other_parent, name='Other-Child1')
+
+    def get_field(self):
+        return NestedHyperlinkedRelatedField(many=True, view_name='child1-detail', queryset=Child1.objects.all())
+
+    def get_one_by_one_field(self):
+        child = NestedHyperlinkedRelatedField(view_name='child1-detail', queryset=Child1.objects.all())
+        return ManyRelatedField(child_relation=child)
+
+    def url(self, child, parent=None):
+        return reverse('child1-detail', kwargs={'parent_pk': (parent or child.parent).pk, 'pk': child.pk})
+
+    def test_single_query(self):
+        field = self.get_field()
+        self.assertIsInstance(field, NestedManyRelatedField)
+
+        data = [self.url(child) for child in reversed(self.children)]
+        with self.assertNumQueries(1):
+            result = field.to_internal_value(data)
+        self.assertEqual(result, list(reversed(self.children)))
+
+    def test_one_query_per_parent(self):
+        data = [self.url(self.children[0]), self.url(self.other_child), str(self.children[1].pk), self.url(self.children[2])]
+        with self.assertNumQueries(3):
+            result = self.get_field().to_internal_value(data)
+        self.assertEqual(result, [self.children[0], self.other_child, self.children[1], self.children[2]])
+
+    def test_same_errors_as_one_by_one(self):
+        cases = [
+            [self.url(self.children[0]), self.url(self.other_child, parent=self.parent)],
+            [self.url(self.other_child, parent=self.parent), '/not/a/url/'],
+            ['/not/a/url/', self.url(self.other_child, parent=self.parent)],
+            [self.url(self.children[0]), 12],
+            ['999'],
+            ['abc'],
+            'not a list',
+        ]
+        for data in cases:
+            with self.assertRaises(Exception) as expected:
+                self.get_one_by_one_field().to_internal_value(data)
+            with self.assertRaises(Exception) as bulk:
+                self.get_field().to_internal_value(data)
+            self.assertIs(type(bulk.exception), type(expected.exception))
+            self.assertEqual(str(bulk.exception), str(expected.exception), data)
+
+
+class TestCompiledParentLookups(TestCase):
+    def setUp(self):
+        self.parent = Parent.objects.create(name='Parent')
+        self.child2 = Child2.objects.create(root=self.parent, name='Child2')
+        self.grandchild = GrandChild1.objects.create(parent=self.child2, name='Grand')
+        self.expected = 'http://testserver/parent2/%s/child2/%s/grandchild1/%s/' % (self.parent.pk, self.child2.pk, self.grandchild.pk)
+
+    def test_compile_lookup(self):
+        grandchild = GrandChild1.objects.get(pk=self.grandchild.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(compile_lookup(GrandChild1, ['parent', 'pk'])(grandchild), self.child2.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(compile_lookup(GrandChild1, ['parent', 'root', 'pk'])(grandchild), self.parent.pk)
+        self.assertEqual(compile_lookup(GrandChild1, ['parent', 'name'])(grandchild), 'Child2')
+        # not attributes of the model
+        self.assertIsNone(compile_lookup(GrandChild1, ['parent_pk']))
+        self.assertIsNone(compile_lookup(GrandChild1, ['missing', 'pk']))
+
+    def test_compiled_at_bind(self):
+        field = ParentChild2GrandChild1Serializer(context={'request': factory.get('/')}).fields['url']
+        self.assertEqual([url_kwarg for url_kwarg, _get_value in field._parent_getters[GrandChild1]], ['parent_pk', 'root_pk'])
+
+        grandchild = GrandChild1.objects.select_related('parent').get(pk=self.grandchild.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(field.to_representation(grandchild), self.expected)
+
+    def test_annotation(self):
+        field = NestedHyperlinkedRelatedField(
+            view_name='grandchild1-detail', read_only=True, source='*',
+            parent_lookup_kwargs={'parent_pk': 'parent_pk', 'root_pk': 'root_pk'},
+        )
+        field.bind('url', Serializer(context={'request': factory.get('/')}))
+        grandchild = GrandChild1.objects.annotate(parent_pk=F('parent'), root_pk=F('parent__root')).get(pk=self.grandchild.pk)
+        self.assertEqual(field.to_representation(grandchild), self.expected)
+        self.assertIsNone(field._parent_getters[GrandChild1])
+
+
+class TestAsyncNestedHyperlinkedRelatedField(TestCase):
+    parent_lookup_kwargs = {'parent_pk': 'parent__pk', 'root_pk': 'parent__root__pk'}
+
+    def setUp(self):
+        self.parent = Parent.objects.create(name='Parent')
+        self.child2 = Child2.objects.create(root=self.parent, name='Child2')
+        self.grandchild = GrandChild1.objects.create(parent=self.child2, name='Grand')
+        self.serializer = Serializer(context={'request': factory.get('/')})
+
+    def bind(self, field, field_name):
+        field.bind(field_name, self.serializer)
+        return field
+
+    async def test_identity(self):
+        grandchild = await GrandChild1.objects.aget(pk=self.grandchild.pk)
+        expected = 'http://testserver/parent2/%s/child2/%s/grandchild1/%s/' % (self.parent.pk, self.child2.pk, grandchild.pk)
+
+        field = self.bind(NestedHyperlinkedRelatedField(
+            view_name='grandchild1-detail', parent_lookup_kwargs=self.parent_lookup_kwargs, read_only=True, source='*',
+        ), 'url')
+        with self.assertRaises(SynchronousOnlyOperation):
+            field.to_representation(grandchild)
+
+        field = self.bind(AsyncNestedHyperlinkedIdentityField(
+            view_name='grandchild1-detail', parent_lookup_kwargs=self.parent_lookup_kwargs,
+        ), 'url')
+        self.assertEqual(await field.aget_attribute(grandchild), grandchild)
+        self.assertEqual(await field.ato_representation(grandchild), expected)
+
+    async def test_related(self):
+        grandchild = await GrandChild1.objects.aget(pk=self.grandchild.pk)
+        field = self.bind(AsyncNestedHyperlinkedRelatedField(
+            view_name='child2-detail', parent_lookup_kwargs={'root_pk': 'root__pk'}, read_only=True,
+        ), 'parent')
+        child2 = await field.aget_attribute(grandchild)
+        self.assertEqual(child2, self.child2)
+        self.assertEqual(
+            await field.ato_representation(child2),
+            'http://testserver/parent2/%s/child2/%s/' % (self.parent.pk, self.child2.pk),
+        )
@@ -1,11 +1,15 @@
 """
 based upon https://github.com/alanjds/drf-nested-routers/issues/15
 """
+import json
+import unittest
 from collections import namedtuple
 from django.db import models
 from django.test import TestCase
+from rest_framework.decorators import action
+from rest_framework.routers import Route
 from rest_framework.viewsets import ModelViewSet
-from rest_framework_nested.routers import SimpleRouter, NestedSimpleRouter
+from rest_framework_nested.routers import SUPPORTS_USE_REGEX_PATH, SimpleRouter, NestedSimpleRouter, RouteEntry
 
 from tests.helpers import get_regex_pattern
 
@@ -95,6 +99,10 @@ class TestNestedSimpleRouter(TestCase):
         self.assertEqual(get_regex_pattern(urls[1]), '^a/(?P<a_pk>[0-9a-f]{32})/b/(?P<b_pk>[^/.]+)/c/(?P<pk>[^/.]+)/$')
 
 
+requires_use_regex_path = unittest.skipUnless(SUPPORTS_USE_REGEX_PATH, 'use_regex_path needs DRF 3.15')
+
+
+@requires_use_regex_path
 class TestNonRegexNestedSimpleRouter(TestCase):
     def setUp(self):
         self.router = SimpleRouter(use_regex_path=False)
@@ -124,6 +132,42 @@ class TestNonRegexNestedSimpleRouter(TestCase):
         self.assertEqual(pattern_from_url(urls[1]), 'a/<str:a_pk>/b/<str:b_pk>/c/<str:pk>/')
 
 
+class AConverterViewSet(ModelViewSet):
+    lookup_value_regex = '[0-9]+'
+    lookup_value_converter = 'int'
+    model = A
+    queryset = QS(A)
+
+
+@requires_use_regex_path
+class TestConverterNestedSimpleRouter(TestCase):
+    def test_inherits_use_regex_path(self):
+        router = SimpleRouter(use_regex_path=False)
+        router.register(r'a', AConverterViewSet)
+        a_router = NestedSimpleRouter(router, r'a', lookup='a')
+        a_router.register(r'b', BViewSet)
+        b_router = NestedSimpleRouter(a_router, r'b', lookup='b')
+        b_router.register(r'c', CViewSet)
+
+        self.assertEqual(b_router.parent_regex, 'a/<int:a_pk>/b/<str:b_pk>/')
+        urls = b_router.urls
+        self.assertEqual(pattern_from_url(urls[0]), 'a/<int:a_pk>/b/<str:b_pk>/c/')
+        self.assertEqual(pattern_from_url(urls[1]), 'a/<int:a_pk>/b/<str:b_pk>/c/<str:pk>/')
+        self.assertEqual(urls[1].resolve('a/1/b/2/c/3/').kwargs, {'a_pk': 1, 'b_pk': '2', 'pk': '3'})
+
+    def test_regex_parents(self):
+        router = SimpleRouter()
+        router.register(r'a', AViewSet)
+        a_router = NestedSimpleRouter(router, r'a', lookup='a')
+        a_router.register(r'b', BViewSet)
+        b_router = NestedSimpleRouter(a_router, r'b', lookup='b', use_regex_path=False)
+        b_router.register(r'c', CViewSet)
+
+        self.assertEqual(a_router.parent_regex, 'a/(?P<a_pk>[0-9a-f]{32})/')
+        self.assertEqual(b_router.parent_regex, 'a/<str:a_pk>/b/<str:b_pk>/')
+        self.assertEqual(pattern_from_url(b_router.urls[0]), 'a/<str:a_pk>/b/<str:b_pk>/c/')
+
+
 class TestEmptyPrefix(TestCase):
     def setUp(self):
         self.router = SimpleRouter()
@@ -139,6 +183,65 @@ class TestEmptyPrefix(TestCase):
         self.assertEqual(get_regex_pattern(urls[1]), '^(?P<a_pk>[0-9a-f]{32})/b/(?P<pk>[^/.]+)/$')
 
 
+class TestParentRegistry(TestCase):
+    def setUp(self):
+        self.router = SimpleRouter()
+        self.router.register(r'a', AViewSet)
+
+    def test_parent_registered_later(self):
+        NestedSimpleRouter(self.router, r'a', lookup='a')
+        self.router.register(r'b', BViewSet)
+
+        b_router = NestedSimpleRouter(self.router, r'b', lookup='b')
+        b_router.register(r'c', CViewSet)
+        self.assertEqual(b_router.parent_regex, 'b/(?P<b_pk>[^/.]+)/')
+        self.assertEqual(get_regex_pattern(b_router.urls[0]), '^b/(?P<b_pk>[^/.]+)/c/$')
+
+    def test_first_registered_prefix_wins(self):
+        self.router.register(r'a', BViewSet, basename='other-a')
+
+        a_router = NestedSimpleRouter(self.router, r'a', lookup='a')
+        self.assertEqual(a_router.parent_regex, 'a/(?P<a_pk>[0-9a-f]{32})/')
+
+    def test_parent_not_registered(self):
+        with self.assertRaises(RuntimeError):
+            NestedSimpleRouter(self.router, r'missing', lookup='missing')
+
+    def test_nested_routes(self):
+        a_router = NestedSimpleRouter(self.router, r'a', lookup='a')
+        self.assertEqual(a_router.routes, SimpleRouter.routes)
+        self.assertEqual(a_router.get_routes(BViewSet)[0].url, r'^a/(?P<a_pk>[0-9a-f]{{32}})/{prefix}{trailing_slash}$')
+
+    def test_declared_routes(self):
+        class ListOnlyRouter(NestedSimpleRouter):
+            routes = [
+                Route(
+                    url=r'^{prefix}{trailing_slash}$',
+                    mapping={'get': 'list'},
+                    name='{basename}-list',
+                    detail=False,
+                    initkwargs={'suffix': 'List'},
+                ),
+            ]
+
+        a_router = ListOnlyRouter(self.router, r'a', lookup='a')
+        a_router.register(r'b', BViewSet)
+        self.assertEqual([get_regex_pattern(url) for url in a_router.urls], ['^a/(?P<a_pk>[0-9a-f]{32})/b/$'])
+
+    def test_action_url_path_regex(self):
+        class ActionViewSet(BViewSet):
+            @action(detail=False, url_path=r'by-name/(?P<name>[^/]+)')
+            def by_name(self, request, *args, **kwargs):
+                pass
+
+        a_router = NestedSimpleRouter(self.router, r'a', lookup='a')
+        a_router.register(r'b', ActionViewSet, basename='b')
+        self.assertIn(
+            '^a/(?P<a_pk>[0-9a-f]{32})/b/by-name/(?P<name>[^/]+)/$',
+            [get_regex_pattern(url) for url in a_router.urls],
+        )
+
+
 class TestBadLookupValue(TestCase):
     def setUp(self):
         self.router = SimpleRouter()
@@ -235,3 +338,47 @@ class TestRouterSettingInheritance(TestCase):
         self.assertEqual(a_router.trailing_slash, '/?', "router does not have trailing slash when it should")
         self.assertTrue(pattern_from_url(a_router.urls[0]).endswith('/?$'),
                         "router created url without trailing slash when it should have")
+
+
+class TestRouteTable(TestCase):
+    def setUp(self):
+        self.router = SimpleRouter()
+        self.router.register(r'a', AViewSet)
+        self.a_router = NestedSimpleRouter(self.router, r'a', lookup='a')
+        self.a_router.register(r'b', BViewSet)
+        self.b_router = NestedSimpleRouter(self.a_router, r'b', lookup='b')
+        self.b_router.register(r'c', CViewSet)
+
+    def test_route_table(self):
+        table = self.b_router.get_route_table()
+        self.assertEqual([entry.name for entry in table], ['c-list', 'c-detail'])
+        self.assertEqual(table[1], RouteEntry(
+            name='c-detail',
+            basename='c',
+            prefix='c',
+            parent_prefixes=('a', 'b'),
+            parent_lookup_kwargs=('a_pk', 'b_pk'),
+            lookup_kwarg='pk',
+            detail=True,
+            depth=2,
+            pattern='^a/(?P<a_pk>[0-9a-f]{32})/b/(?P<b_pk>[^/.]+)/c/(?P<pk>[^/.]+)/$',
+            mapping=(('get', 'retrieve'), ('put', 'update'), ('patch', 'partial_update'), ('delete', 'destroy')),
+        ))
+        self.assertIsNone(table[0].lookup_kwarg)
+        self.assertEqual(
+            [entry.pattern for entry in table],
+            [get_regex_pattern(url) for url in self.b_router.urls],
+        )
+
+    def test_built_once(self):
+        table = self.b_router.get_route_table()
+        self.assertIs(self.b_router.get_route_table(), table)
+
+        self.b_router.register(r'c2', CViewSet, basename='c2')
+        self.assertEqual(len(self.b_router.get_route_table()), 4)
+
+    def test_dump_route_table(self):
+        routes = json.loads(self.a_router.dump_route_table())
+        self.assertEqual(routes[0]['name'], 'b-list')
+        self.assertEqual(routes[0]['parent_lookup_kwargs'], ['a_pk'])
+        self.assertEqual(routes[0]['mapping'], {'get': 'list', 'post': 'create'})
@@ -0,0 +1,106 @@
+import unittest
+
+from django.test import TestCase
+from django.urls import Resolver404, URLResolver, path, re_path
+from django.urls.resolvers import RegexPattern
+from rest_framework.routers import DefaultRouter
+from rest_framework.viewsets import ViewSet
+
+from rest_framework_nested.routers import SUPPORTS_USE_REGEX_PATH, NestedDefaultRouter, NestedSimpleRouter, SimpleRouter
+from rest_framework_nested.urlpatterns import trie_patterns
+
+
+class DummyViewSet(ViewSet):
+    def list(self, request, *args, **kwargs):
+        pass
+
+    def retrieve(self, request, *args, **kwargs):
+        pass
+
+
+def get_resolver(urlpatterns):
+    return URLResolver(RegexPattern(r'^/'), urlpatterns)
+
+
+def other_view(request):
+    pass
+
+
+class TestTriePatterns(TestCase):
+    paths = [
+        '/', '/a/', '/a/1/', '/a/1/b/', '/a/1/b/2/', '/a/1/b/2/c/', '/a/1/b/2/c/3/',
+        '/a/1/d/', '/a/1/d/4/', '/e/', '/e/5/', '/e/5/f/', '/e/5/f/6/',
+        '/a.json', '/a/1.json', '/a/1/b.json', '/a/1/b/2/c/3.api', '/a/1/x/', '/x/', '/a/1/b/2/c/3/4/',
+        '/other/', '/a/1/b/other/', '/zz/', '/a/1/alt/',
+    ]
+
+    def build_urls(self, root_class=SimpleRouter, nested_class=NestedSimpleRouter):
+        router = root_class()
+        router.register('a', DummyViewSet, basename='a')
+        router.register('e', DummyViewSet, basename='e')
+        a_router = nested_class(router, 'a', lookup='a')
+        a_router.register('b', DummyViewSet, basename='b')
+        a_router.register('d', DummyViewSet, basename='d')
+        b_router = nested_class(a_router, 'b', lookup='b')
+        b_router.register('c', DummyViewSet, basename='c')
+        e_router = nested_class(router, 'e', lookup='e')
+        e_router.register('f', DummyViewSet, basename='f')
+        extra_urls = [path('a/1/b/other/', other_view, name='other-1'), path('other/', other_view, name='other-2')]
+        return router.urls + a_router.urls + e_router.urls + b_router.urls + extra_urls
+
+    def resolve(self, resolver, url):
+        try:
+            match = resolver.resolve(url)
+        except Resolver404:
+            return None
+        return match.func, match.url_name, match.args, match.kwargs
+
+    def assertSameResolution(self, urlpatterns):
+        flat = get_resolver(urlpatterns)
+        trie = get_resolver(trie_patterns(urlpatterns))
+        for url in self.paths:
+            self.assertEqual(self.resolve(trie, url), self.resolve(flat, url), url)
+
+        for name, args in flat.reverse_dict.items():
+            if not isinstance(name, str):
+                continue
+            for possibility, pattern, defaults, converters in flat.reverse_dict.getlist(name):
+                for result, params in possibility:
+                    kwargs = {param: '1' for param in params}
+                    self.assertEqual(trie.reverse(name, **kwargs), flat.reverse(name, **kwargs), name)
+
+    def test_simple_router(self):
+        urlpatterns = self.build_urls()
+        grouped = trie_patterns(urlpatterns)
+        self.assertLess(len(grouped), len(urlpatterns))
+        self.assertSameResolution(urlpatterns)
+
+    def test_default_router(self):
+        self.assertSameResolution(self.build_urls(DefaultRouter, NestedDefaultRouter))
+
+    def test_first_match_wins(self):
+        urlpatterns = self.build_urls()
+        # shadows the 'b-list' route for the same path
+        urlpatterns.insert(3, path('a/<str:a_pk>/b/', other_view, name='shadow'))
+        self.assertEqual(get_resolver(trie_patterns(urlpatterns)).resolve('/a/1/b/').url_name, 'shadow')
+        self.assertSameResolution(urlpatterns)
+
+    def test_alternation(self):
+        urlpatterns = self.build_urls()
+        alternation = re_path(r'^a/(?P<a_pk>[^/.]+)/alt/$|^zz/$', other_view, name='alt')
+        urlpatterns.insert(3, alternation)
+        grouped = trie_patterns(urlpatterns)
+        # left as is, the | applies to the whole pattern
+        self.assertIn(alternation, grouped)
+        self.assertEqual(get_resolver(grouped).resolve('/zz/').url_name, 'alt')
+        self.assertEqual(get_resolver(grouped).resolve('/a/1/alt/').url_name, 'alt')
+        self.assertSameResolution(urlpatterns)
+
+    @unittest.skipUnless(SUPPORTS_USE_REGEX_PATH, 'use_regex_path needs DRF 3.15')
+    def test_path_routes(self):
+        router = SimpleRouter(use_regex_path=False)
+        router.register('a', DummyViewSet, basename='a')
+        a_router = NestedSimpleRouter(router, 'a', lookup='a', use_regex_path=False)
+        a_router.register('b', DummyViewSet, basename='b')
+        urlpatterns = router.urls + a_router.urls
+        self.assertEqual(trie_patterns(urlpatterns), urlpatterns)
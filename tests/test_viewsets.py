@@ -2,9 +2,12 @@ import json
 
 from django.core.exceptions import ImproperlyConfigured
 from django.db import models
+from django.http import QueryDict
 from django.test import RequestFactory, TestCase, override_settings
 from django.urls import include, path, reverse
 from rest_framework import status
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
 from rest_framework.reverse import reverse as drf_reverse
 from rest_framework.routers import SimpleRouter
 from rest_framework.schemas import generators
@@ -13,7 +16,9 @@ from rest_framework.viewsets import ModelViewSet
 
 from rest_framework_nested.routers import NestedSimpleRouter
 from rest_framework_nested.serializers import NestedHyperlinkedModelSerializer
-from rest_framework_nested.viewsets import NestedViewSetMixin
+from rest_framework_nested.viewsets import (
+    AsyncNestedViewSetMixin, NestedViewSetMixin, ParentLookup, ParentLookupListOverlay, overlay_parent_lookups,
+)
 
 factory = RequestFactory()
 
@@ -67,6 +72,42 @@ class ChildWithNestedMixinViewSetDefinedInViewset(NestedViewSetMixin, ModelViewS
     serializer_class = ChildSerializerWithoutParentKwargs
     queryset = Child.objects.all()
 
+class ChildWithSelectRelatedViewSet(NestedViewSetMixin, ModelViewSet):
+    """Identical to `ChildWithNestedMixinViewSet` but joining the parents."""
+    auto_select_related = True
+    serializer_class = ChildSerializer
+    queryset = Child.objects.all()
+
+
+class ChildWithDeferredParentViewSet(ChildWithSelectRelatedViewSet):
+    queryset = Child.objects.only('name')
+
+
+class ChildWithParentExistenceCheckViewSet(NestedViewSetMixin, ModelViewSet):
+    """Identical to `ChildWithNestedMixinViewSet` but checking the parent exists."""
+    check_parent_existence = True
+    serializer_class = ChildSerializer
+    queryset = Child.objects.all()
+
+
+class ChildWithParentOverlayViewSet(NestedViewSetMixin, ModelViewSet):
+    """Identical to `ChildWithNestedMixinViewSet` but leaving `request.data` untouched."""
+    parent_lookup_overlay = True
+    serializer_class = ChildSerializer
+    queryset = Child.objects.all()
+
+
+class AsyncChildViewSet(AsyncNestedViewSetMixin, ModelViewSet):
+    """Checking the parent exists, with an async `alist` action."""
+    check_parent_existence = True
+    serializer_class = ChildSerializer
+    queryset = Child.objects.all()
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        return [child.name async for child in queryset]
+
+
 class ChildWithNestedMixinViewSetWithoutParentKwargs(NestedViewSetMixin, ModelViewSet):
     """Identical to `ChildViewSet` but with the mixin."""
     serializer_class = ChildSerializerWithoutParentKwargs
@@ -80,6 +121,10 @@ root_router = NestedSimpleRouter(router, r'root', lookup='parent')
 root_router.register(r'child', ChildViewSet, basename='child')
 root_router.register(r'child-with-nested-mixin', ChildWithNestedMixinViewSet, basename='child-with-nested-mixin')
 root_router.register(r'child-with-nested-mixin-in-view', ChildWithNestedMixinViewSetDefinedInViewset, basename='child-with-nested-mixin-in-view')
+root_router.register(r'child-with-select-related', ChildWithSelectRelatedViewSet, basename='child-with-select-related')
+root_router.register(r'child-with-deferred-parent', ChildWithDeferredParentViewSet, basename='child-with-deferred-parent')
+root_router.register(r'child-with-parent-check', ChildWithParentExistenceCheckViewSet, basename='child-with-parent-check')
+root_router.register(r'child-with-parent-overlay', ChildWithParentOverlayViewSet, basename='child-with-parent-overlay')
 root_router.register(r'child-with-nested-mixin-not-defined', ChildWithNestedMixinViewSetWithoutParentKwargs, basename='child-with-nested-mixin-not-defined')
 
 
@@ -180,6 +225,123 @@ class TestNestedSimpleRouter(TestCase):
         with self.assertRaises(ImproperlyConfigured):
             response = self.client.get(url, content_type='application/json')
 
+    def test_nested_child_viewset_with_mixin_joins_parents(self):
+        """
+        With `auto_select_related`, the `NestedViewSetMixin` selects the
+        relations the serializer follows to build hyperlinks, so listing does
+        not issue a query per child.
+        """
+        url = reverse('child-with-select-related-list', kwargs={'parent_pk': self.root_2.pk})
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()), 2)
+
+    def test_select_related_with_deferred_parent(self):
+        """
+        `auto_select_related` leaves querysets deferring the parent as they
+        are, they can not be joined.
+        """
+        url = reverse('child-with-deferred-parent-list', kwargs={'parent_pk': self.root_2.pk})
+
+        response = self.client.get(url, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json(),
+            self.client.get(reverse('child-with-select-related-list', kwargs={'parent_pk': self.root_2.pk})).json(),
+        )
+
+    def test_missing_parent_without_existence_check(self):
+        url = reverse('child-with-nested-mixin-list', kwargs={'parent_pk': 999})
+
+        response = self.client.get(url, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), [])
+
+    def test_invalid_parent_pk(self):
+        url = reverse('child-with-nested-mixin-list', kwargs={'parent_pk': 'abc'})
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_parent_pk_converted_once(self):
+        request = factory.get('/')
+        view = ChildWithParentExistenceCheckViewSet(request=request, kwargs={'parent_pk': str(self.root_1.pk)}, format_kwarg=None)
+        self.assertEqual(view._get_parent_lookup_values(Child), {'parent_pk': self.root_1.pk})
+        self.assertIs(view._get_parent_lookup_values(Child), view._get_parent_lookup_values(Child))
+
+    def test_parent_lookup_plan(self):
+        def get_view(viewset_class):
+            return viewset_class(request=factory.get('/'), kwargs={'parent_pk': '1'}, format_kwarg=None)
+
+        plan = get_view(ChildWithNestedMixinViewSet)._get_parent_lookup_plan(Child)
+        self.assertEqual(plan, (ParentLookup('parent_pk', 'parent__pk', 'parent', 'pk', Root._meta.pk),))
+        self.assertIs(get_view(ChildWithNestedMixinViewSet)._get_parent_lookup_plan(Child), plan)
+
+        class DynamicViewSet(ChildWithNestedMixinViewSet):
+            cache_parent_lookup_plan = False
+
+        view = get_view(DynamicViewSet)
+        self.assertEqual(view._get_parent_lookup_plan(Child), plan)
+        self.assertIs(view._get_parent_lookup_plan(Child), view._get_parent_lookup_plan(Child))
+        self.assertIsNot(get_view(DynamicViewSet)._get_parent_lookup_plan(Child), view._get_parent_lookup_plan(Child))
+
+    def test_missing_parent_with_existence_check(self):
+        for parent_pk in (999, 'abc'):
+            url = reverse('child-with-parent-check-list', kwargs={'parent_pk': parent_pk})
+            response = self.client.get(url, content_type='application/json')
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        url = reverse('child-with-parent-check-list', kwargs={'parent_pk': 999})
+        response = self.client.post(url, content_type='application/json', data=json.dumps({'name': 'New Child'}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(Child.objects.filter(name='New Child').exists())
+
+    def test_existing_parent_with_existence_check(self):
+        """
+        The parent is checked once per request, even though the queryset is
+        built again after `initial()`.
+        """
+        root_3 = Root.objects.create(name='root-3')
+        url = reverse('child-with-parent-check-list', kwargs={'parent_pk': root_3.pk})
+
+        with self.assertNumQueries(2):
+            response = self.client.get(url, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), [])
+
+        url = reverse('child-with-parent-check-detail', kwargs={'parent_pk': self.root_1.pk, 'pk': self.root_1_child_a.pk})
+        with self.assertNumQueries(3):
+            response = self.client.get(url, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def get_async_view(self, parent_pk, action):
+        view = AsyncChildViewSet(action=action, kwargs={'parent_pk': parent_pk}, format_kwarg=None)
+        view.request = Request(factory.get('/'))
+        return view
+
+    async def test_async_parent_existence_check(self):
+        view = self.get_async_view(self.root_2.pk, 'alist')
+        names = await view.alist(view.request)
+        self.assertEqual(sorted(names), ['root-2-child-b', 'root-2-child-c'])
+
+        view = self.get_async_view(self.root_2.pk + 100, 'alist')
+        with self.assertRaises(NotFound):
+            await view.alist(view.request)
+
+    def test_async_parent_existence_check_deferred(self):
+        # async actions check from afilter_queryset() instead
+        view = self.get_async_view(self.root_2.pk + 100, 'alist')
+        with self.assertNumQueries(0):
+            view.get_queryset()
+
+        # sync actions as usual
+        view = self.get_async_view(self.root_2.pk + 100, 'list')
+        with self.assertRaises(NotFound):
+            view.get_queryset()
+
     def test_create_child_on_viewset_with_mixin(self):
         """
         The `ViewSet` that uses `NestedViewSetMixin` automatically sets the
@@ -207,6 +369,37 @@ class TestNestedSimpleRouter(TestCase):
                                  request=response.wsgi_request)
         self.assertEqual(data['parent'], parent_url)
 
+    def test_create_child_on_viewset_with_overlay(self):
+        resource_url = reverse('child-with-parent-overlay-list', kwargs={'parent_pk': self.root_1.pk})
+
+        response = self.client.post(resource_url, content_type='application/json', data=json.dumps({'name': 'New Child'}))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Child.objects.get(name='New Child').parent, self.root_1)
+        request = response.renderer_context['request']
+        self.assertEqual(request.data, {'name': 'New Child'})
+        self.assertNotIn('parent', request.query_params)
+
+        response = self.client.post(resource_url, data={'name': 'Form Child'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Child.objects.get(name='Form Child').parent, self.root_1)
+        self.assertNotIn('parent', response.renderer_context['request'].data)
+
+    def test_overlay_parent_lookups(self):
+        data = [{'name': 'a'}, {'name': 'b', 'parent': '2'}]
+        overlay = overlay_parent_lookups(data, {'parent': '1'})
+        self.assertIsInstance(overlay, ParentLookupListOverlay)
+        self.assertEqual([dict(item) for item in overlay], [{'name': 'a', 'parent': '1'}, {'name': 'b', 'parent': '1'}])
+        self.assertEqual(overlay[0]['parent'], '1')
+        self.assertEqual(data, [{'name': 'a'}, {'name': 'b', 'parent': '2'}])
+
+        querydict = QueryDict('name=a&tag=x&tag=y')
+        overlay = overlay_parent_lookups(querydict, {'parent': '1'})
+        self.assertEqual(overlay.getlist('tag'), ['x', 'y'])
+        self.assertEqual(overlay.getlist('parent'), ['1'])
+        self.assertEqual(dict(overlay.lists()), {'name': ['a'], 'tag': ['x', 'y'], 'parent': ['1']})
+        self.assertEqual(len(overlay), 3)
+        self.assertNotIn('parent', querydict)
+
     def test_get_queryset_for_children_resource(self):
         gen = generators.BaseSchemaGenerator()
         gen._initialise_endpoints()